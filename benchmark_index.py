@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Benchmark index generation against a synthetic research repository
+Builds a throwaway git repo with a configurable number of project directories, commits and
+summary sizes, then times each phase of the index pipeline and records the results as JSON
+"""
+import argparse
+import json
+import os
+import pathlib
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import generate_index
+import project_manifest
+import summaries
+
+BASE_TIMESTAMP = 1700000000
+RESULTS_PATH = 'benchmark-results.json'
+
+def synthetic_text(size, seed):
+    """Return about size bytes of varied words, so summaries produce realistic search tokens"""
+    words = []
+    length = 0
+    i = seed
+    while length < size:
+        word = f"word{(i * 7919) % 4999}"
+        words.append(word)
+        length += len(word) + 1
+        i += 1
+    return ' '.join(words)[:size]
+
+def build_synthetic_repo(path, num_projects, commits_per_project, summary_bytes=0):
+    """Create a git repo with num_projects directories using git fast-import
+
+    Each project's first commit adds a README.md, a _summary.md of
+    summary_bytes (if non-zero) and, for every third project, an index.html.
+    Every commit adds one more notes file so history depth grows with
+    commits_per_project. A final commit renames the first project, so the
+    date lookups are also checked against a directory created by `git mv`.
+    """
+    subprocess.run(['git', 'init', '-q', str(path)], check=True)
+    stream = []
+    mark = 0
+    for commit in range(commits_per_project):
+        for project in range(num_projects):
+            mark += 1
+            timestamp = BASE_TIMESTAMP + mark * 60
+            name = f"project-{project:05d}"
+            files = {f"notes-{commit}.md": f"# {name}\n\nRevision {commit}\n"}
+            if commit == 0:
+                files["README.md"] = f"# {name}\n\n{synthetic_text(summary_bytes * 4, project)}\n"
+                if summary_bytes:
+                    files["_summary.md"] = synthetic_text(summary_bytes, project) + "\n"
+                if project % 3 == 0:
+                    files["index.html"] = f"<!DOCTYPE html><title>{name}</title>\n"
+            message = f"Update {name}\n"
+            stream.append('commit refs/heads/main\n')
+            stream.append(f'mark :{mark}\n')
+            stream.append(f'author Bench <bench@example.com> {timestamp} +0000\n')
+            stream.append(f'committer Bench <bench@example.com> {timestamp} +0000\n')
+            stream.append(f'data {len(message.encode())}\n{message}')
+            if mark > 1:
+                stream.append(f'from :{mark - 1}\n')
+            for filename, content in files.items():
+                stream.append(f'M 644 inline {name}/{filename}\n')
+                stream.append(f'data {len(content.encode())}\n{content}\n')
+    if num_projects:
+        mark += 1
+        timestamp = BASE_TIMESTAMP + mark * 60
+        message = "Rename project-00000\n"
+        stream.append('commit refs/heads/main\n')
+        stream.append(f'mark :{mark}\n')
+        stream.append(f'author Bench <bench@example.com> {timestamp} +0000\n')
+        stream.append(f'committer Bench <bench@example.com> {timestamp} +0000\n')
+        stream.append(f'data {len(message.encode())}\n{message}')
+        if mark > 1:
+            stream.append(f'from :{mark - 1}\n')
+        stream.append('R project-00000 renamed-00000\n')
+    subprocess.run(
+        ['git', 'fast-import', '--quiet'],
+        input=''.join(stream),
+        text=True,
+        cwd=path,
+        check=True
+    )
+    subprocess.run(['git', 'checkout', '-q', 'main'], cwd=path, check=True)
+
+def bench_git_dates(path):
+    """Time per-directory and single-pass git date lookups, checking they agree"""
+    cwd = os.getcwd()
+    os.chdir(path)
+    try:
+        dirnames = sorted(d.name for d in pathlib.Path.cwd().iterdir()
+                          if d.is_dir() and not d.name.startswith('.'))
+
+        start = time.perf_counter()
+        per_directory = {name: project_manifest.get_git_date(name) for name in dirnames}
+        per_directory_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        all_dates = project_manifest.get_git_dates() or {}
+        single_pass = {name: all_dates.get(name) for name in dirnames}
+        single_pass_seconds = time.perf_counter() - start
+    finally:
+        os.chdir(cwd)
+
+    if per_directory != single_pass:
+        mismatched = [name for name in dirnames if per_directory[name] != single_pass[name]]
+        raise RuntimeError(f"Date mismatch for {len(mismatched)} directories, e.g. {mismatched[:5]}")
+
+    return per_directory_seconds, single_pass_seconds
+
+def timed(phases, name, func, *args, **kwargs):
+    """Run func, keeping the fastest time seen for this phase across repeats"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    phases[name] = min(elapsed, phases.get(name, elapsed))
+    return result
+
+def bench_pipeline(path, repeat=1, workers=None):
+    """Time each phase of the index pipeline, cold and warm, inside the synthetic repo"""
+    phases = {}
+    cwd = os.getcwd()
+    os.chdir(path)
+    try:
+        for _ in range(repeat):
+            for cache in (project_manifest.CACHE_PATH, project_manifest.GIT_DATES_PATH, 'index.html'):
+                if os.path.exists(cache):
+                    os.unlink(cache)
+
+            timed(phases, 'git_dates', project_manifest.get_git_dates)
+            manifest = timed(phases, 'discovery_cold', project_manifest.build_manifest, workers=workers)
+            timed(phases, 'git_dates_incremental', project_manifest.load_git_dates)
+            manifest = timed(phases, 'discovery_warm', project_manifest.build_manifest, workers=workers)
+
+            projects = manifest['projects']
+            timed(phases, 'summary_check', summaries.check_summaries,
+                  projects, pathlib.Path.cwd(), summaries.load_summary_index())
+            timed(phases, 'search_index', generate_index.build_search_index, projects)
+            page = timed(phases, 'render', lambda: ''.join(
+                generate_index.render_page(projects, manifest['origin'], 'style.css')))
+            timed(phases, 'write_changed', generate_index.write_if_changed, 'index.html', [page])
+            timed(phases, 'write_unchanged', generate_index.write_if_changed, 'index.html', [page])
+    finally:
+        os.chdir(cwd)
+    return phases, len(page.encode('utf-8'))
+
+def git_version():
+    """Return the installed git version string"""
+    result = subprocess.run(['git', '--version'], capture_output=True, text=True)
+    return result.stdout.strip()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark index generation on a synthetic repo")
+    parser.add_argument('--projects', type=int, default=500, help="Number of project directories")
+    parser.add_argument('--commits', type=int, default=3, help="Commits per project directory")
+    parser.add_argument('--summary-bytes', type=int, default=600, help="Size of each _summary.md")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per phase; the fastest is kept")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Number of threads used to scan project directories")
+    parser.add_argument('--compare-per-directory', action='store_true',
+                        help="Also time the old one-git-log-per-directory lookup")
+    parser.add_argument('--output', default=RESULTS_PATH, help="JSON file to write results to")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = pathlib.Path(tmp) / 'repo'
+        start = time.perf_counter()
+        build_synthetic_repo(repo, args.projects, args.commits, args.summary_bytes)
+        build_seconds = time.perf_counter() - start
+        print(f"Built repo with {args.projects} projects x {args.commits} commits "
+              f"in {build_seconds:.2f}s")
+
+        phases, page_bytes = bench_pipeline(repo, repeat=args.repeat, workers=args.workers)
+        if args.compare_per_directory:
+            phases['git_dates_per_directory'], _ = bench_git_dates(repo)
+
+    for name, seconds in phases.items():
+        print(f"  {name:<24} {seconds * 1000:10.1f} ms")
+    if 'git_dates_per_directory' in phases:
+        print(f"  Single-pass speedup:     {phases['git_dates_per_directory'] / phases['git_dates']:.1f}x")
+
+    results = {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': sys.version.split()[0],
+        'git': git_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'params': {
+            'projects': args.projects,
+            'commits': args.commits,
+            'summary_bytes': args.summary_bytes,
+            'repeat': args.repeat,
+            'workers': args.workers
+        },
+        'build_seconds': build_seconds,
+        'page_bytes': page_bytes,
+        'phases': phases
+    }
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Wrote {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -1,290 +1,242 @@
 #!/usr/bin/env python3
 """
 Generate index.html for the research repository
-This script discovers all research project directories and creates an index page with links and summaries
+This script renders the project manifest into an index page with links and summaries
 """
 import os
-import subprocess
 import pathlib
-from datetime import datetime, timezone
+from datetime import datetime
+from string import Template
+import argparse
+import gzip
+import hashlib
 import html
+import json
+import tempfile
+
+import instrumentation
+from project_manifest import STOPWORDS, load_manifest
+from summaries import check_summaries, load_summary_index
+
+DATA_DIR = 'index-data'
+SHARD_MANIFEST_PATH = os.path.join(DATA_DIR, 'shards.json')
+SEARCH_INDEX_PATH = os.path.join(DATA_DIR, 'search.json')
+PRECACHE_MANIFEST_PATH = 'precache-manifest.json'
+# Site-level files the service worker precaches alongside index.html and project pages
+PRECACHE_ASSETS = ['manifest.json', 'icon-192.png', 'icon-512.png', 'apple-touch-icon.png']
+
+# Shared page styles, served as a content-hashed stylesheet so browsers can cache them long-term
+PAGE_CSS = """* {
+    margin: 0;
+    padding: 0;
+    box-sizing: border-box;
+}
+
+body {
+    font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
+    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+    min-height: 100vh;
+    padding: 40px 20px;
+    color: #1f2937;
+}
+
+.container {
+    max-width: 1200px;
+    margin: 0 auto;
+}
+
+header {
+    text-align: center;
+    color: white;
+    margin-bottom: 50px;
+}
+
+header h1 {
+    font-size: 3em;
+    margin-bottom: 15px;
+    text-shadow: 2px 2px 4px rgba(0,0,0,0.2);
+}
+
+header p {
+    font-size: 1.2em;
+    opacity: 0.95;
+    max-width: 700px;
+    margin: 0 auto;
+}
+
+.stats {
+    text-align: center;
+    color: white;
+    margin-bottom: 30px;
+    font-size: 1.1em;
+}
+
+.search-box {
+    display: block;
+    width: 100%;
+    max-width: 500px;
+    margin: 15px auto 0;
+    padding: 12px 20px;
+    border: none;
+    border-radius: 8px;
+    font-size: 1em;
+    box-shadow: 0 5px 15px rgba(0,0,0,0.2);
+}
+
+.projects-grid {
+    display: grid;
+    grid-template-columns: repeat(auto-fit, minmax(350px, 1fr));
+    gap: 30px;
+    margin-top: 40px;
+}
+
+.project-card {
+    background: white;
+    border-radius: 16px;
+    padding: 30px;
+    box-shadow: 0 10px 40px rgba(0,0,0,0.2);
+    transition: transform 0.3s, box-shadow 0.3s;
+    position: relative;
+    overflow: hidden;
+}
+
+.project-card::before {
+    content: '';
+    position: absolute;
+    top: 0;
+    left: 0;
+    right: 0;
+    height: 5px;
+    background: linear-gradient(90deg, #667eea, #764ba2);
+}
+
+.project-card:hover {
+    transform: translateY(-5px);
+    box-shadow: 0 15px 50px rgba(0,0,0,0.3);
+}
+
+.project-icon {
+    font-size: 3em;
+    margin-bottom: 15px;
+}
+
+.project-title {
+    font-size: 1.8em;
+    margin-bottom: 10px;
+    color: #1f2937;
+    word-break: break-word;
+}
+
+.project-date {
+    color: #6b7280;
+    font-size: 0.9em;
+    margin-bottom: 15px;
+}
+
+.project-description {
+    color: #6b7280;
+    line-height: 1.6;
+    margin-bottom: 20px;
+    min-height: 80px;
+}
+
+.project-links {
+    display: flex;
+    gap: 10px;
+    flex-wrap: wrap;
+}
+
+.btn {
+    padding: 10px 20px;
+    border-radius: 8px;
+    text-decoration: none;
+    font-weight: 600;
+    transition: all 0.3s;
+    display: inline-block;
+    text-align: center;
+    flex: 1;
+    min-width: 120px;
+}
+
+.btn-primary {
+    background: linear-gradient(135deg, #667eea, #764ba2);
+    color: white;
+}
+
+.btn-primary:hover {
+    transform: scale(1.05);
+    box-shadow: 0 5px 15px rgba(102, 126, 234, 0.4);
+}
+
+.btn-secondary {
+    background: #f3f4f6;
+    color: #374151;
+}
+
+.btn-secondary:hover {
+    background: #e5e7eb;
+}
+
+.badge {
+    position: absolute;
+    top: 15px;
+    right: 15px;
+    background: #10b981;
+    color: white;
+    padding: 5px 12px;
+    border-radius: 20px;
+    font-size: 0.75em;
+    font-weight: 600;
+    text-transform: uppercase;
+}
+
+footer {
+    text-align: center;
+    margin-top: 60px;
+    color: white;
+    opacity: 0.9;
+}
+
+footer a {
+    color: white;
+    text-decoration: underline;
+}
+
+@media (max-width: 768px) {
+    header h1 {
+        font-size: 2em;
+    }
+
+    .projects-grid {
+        grid-template-columns: 1fr;
+    }
+}
+"""
 
-def get_git_date(dirname):
-    """Get the first commit date for a directory"""
-    try:
-        result = subprocess.run(
-            ['git', 'log', '--diff-filter=A', '--follow', '--format=%aI', '--reverse', '--', dirname],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        if result.returncode == 0 and result.stdout.strip():
-            date_str = result.stdout.strip().split('\n')[0]
-            return datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-    except Exception:
-        pass
-    return None
-
-def get_git_origin():
-    """Get the GitHub origin URL"""
-    try:
-        result = subprocess.run(
-            ['git', 'remote', 'get-url', 'origin'],
-            capture_output=True,
-            text=True,
-            timeout=2
-        )
-        if result.returncode == 0 and result.stdout.strip():
-            origin = result.stdout.strip()
-            if origin.startswith('git@github.com:'):
-                origin = origin.replace('git@github.com:', 'https://github.com/')
-            if origin.endswith('.git'):
-                origin = origin[:-4]
-            return origin
-    except Exception:
-        pass
-    return None
-
-def get_project_icon(dirname):
-    """Return an icon emoji based on directory name keywords"""
-    name_lower = dirname.lower()
-    if 'git' in name_lower or 'version' in name_lower:
-        return '🃏'
-    elif 'money' in name_lower or 'finance' in name_lower or 'lifestyle' in name_lower or 'fire' in name_lower or 'inflat' in name_lower:
-        return '💰'
-    elif 'three' in name_lower or '3d' in name_lower or 'layer' in name_lower or 'quiz' in name_lower:
-        return '🎮'
-    elif 'web' in name_lower or 'html' in name_lower:
-        return '🌐'
-    elif 'data' in name_lower or 'analysis' in name_lower:
-        return '📊'
-    elif 'ai' in name_lower or 'llm' in name_lower or 'gpt' in name_lower:
-        return '🤖'
-    else:
-        return '🔬'
-
-def main():
-    research_dir = pathlib.Path.cwd()
-    github_origin = get_git_origin()
-
-    # Collect all subdirectories with metadata
-    projects = []
-    for d in research_dir.iterdir():
-        if d.is_dir() and not d.name.startswith('.'):
-            readme_path = d / "README.md"
-            summary_path = d / "_summary.md"
-
-            # Get commit date or fallback to mtime
-            commit_date = get_git_date(d.name)
-            if not commit_date:
-                commit_date = datetime.fromtimestamp(d.stat().st_mtime, tz=timezone.utc)
-
-            # Read summary if available
-            summary = None
-            if summary_path.exists():
-                with open(summary_path, 'r') as f:
-                    summary = f.read().strip()
-
-            # Determine if README exists
-            has_readme = readme_path.exists()
-
-            # Check if project has an index.html
-            has_index = (d / "index.html").exists()
-
-            projects.append({
-                'name': d.name,
-                'date': commit_date,
-                'summary': summary,
-                'has_readme': has_readme,
-                'has_index': has_index,
-                'icon': get_project_icon(d.name)
-            })
-
-    # Sort by date, newest first
-    projects.sort(key=lambda x: x['date'], reverse=True)
-
-    # Generate HTML
-    html_content = f"""<!DOCTYPE html>
+# Page templates are parsed once at import and filled per build
+PAGE_HEADER = Template("""<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Research Projects - AI-Generated Tools</title>
-    <style>
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 100vh;
-            padding: 40px 20px;
-            color: #1f2937;
-        }}
-
-        .container {{
-            max-width: 1200px;
-            margin: 0 auto;
-        }}
-
-        header {{
-            text-align: center;
-            color: white;
-            margin-bottom: 50px;
-        }}
-
-        header h1 {{
-            font-size: 3em;
-            margin-bottom: 15px;
-            text-shadow: 2px 2px 4px rgba(0,0,0,0.2);
-        }}
-
-        header p {{
-            font-size: 1.2em;
-            opacity: 0.95;
-            max-width: 700px;
-            margin: 0 auto;
-        }}
-
-        .stats {{
-            text-align: center;
-            color: white;
-            margin-bottom: 30px;
-            font-size: 1.1em;
-        }}
-
-        .projects-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(350px, 1fr));
-            gap: 30px;
-            margin-top: 40px;
-        }}
-
-        .project-card {{
-            background: white;
-            border-radius: 16px;
-            padding: 30px;
-            box-shadow: 0 10px 40px rgba(0,0,0,0.2);
-            transition: transform 0.3s, box-shadow 0.3s;
-            position: relative;
-            overflow: hidden;
-        }}
-
-        .project-card::before {{
-            content: '';
-            position: absolute;
-            top: 0;
-            left: 0;
-            right: 0;
-            height: 5px;
-            background: linear-gradient(90deg, #667eea, #764ba2);
-        }}
-
-        .project-card:hover {{
-            transform: translateY(-5px);
-            box-shadow: 0 15px 50px rgba(0,0,0,0.3);
-        }}
-
-        .project-icon {{
-            font-size: 3em;
-            margin-bottom: 15px;
-        }}
-
-        .project-title {{
-            font-size: 1.8em;
-            margin-bottom: 10px;
-            color: #1f2937;
-            word-break: break-word;
-        }}
-
-        .project-date {{
-            color: #6b7280;
-            font-size: 0.9em;
-            margin-bottom: 15px;
-        }}
-
-        .project-description {{
-            color: #6b7280;
-            line-height: 1.6;
-            margin-bottom: 20px;
-            min-height: 80px;
-        }}
-
-        .project-links {{
-            display: flex;
-            gap: 10px;
-            flex-wrap: wrap;
-        }}
-
-        .btn {{
-            padding: 10px 20px;
-            border-radius: 8px;
-            text-decoration: none;
-            font-weight: 600;
-            transition: all 0.3s;
-            display: inline-block;
-            text-align: center;
-            flex: 1;
-            min-width: 120px;
-        }}
-
-        .btn-primary {{
-            background: linear-gradient(135deg, #667eea, #764ba2);
-            color: white;
-        }}
-
-        .btn-primary:hover {{
-            transform: scale(1.05);
-            box-shadow: 0 5px 15px rgba(102, 126, 234, 0.4);
-        }}
-
-        .btn-secondary {{
-            background: #f3f4f6;
-            color: #374151;
-        }}
-
-        .btn-secondary:hover {{
-            background: #e5e7eb;
-        }}
-
-        .badge {{
-            position: absolute;
-            top: 15px;
-            right: 15px;
-            background: #10b981;
-            color: white;
-            padding: 5px 12px;
-            border-radius: 20px;
-            font-size: 0.75em;
-            font-weight: 600;
-            text-transform: uppercase;
-        }}
-
-        footer {{
-            text-align: center;
-            margin-top: 60px;
-            color: white;
-            opacity: 0.9;
-        }}
-
-        footer a {{
-            color: white;
-            text-decoration: underline;
-        }}
-
-        @media (max-width: 768px) {{
-            header h1 {{
-                font-size: 2em;
-            }}
-
-            .projects-grid {{
-                grid-template-columns: 1fr;
-            }}
-        }}
-    </style>
+
+    <!-- PWA Manifest -->
+    <link rel="manifest" href="manifest.json">
+
+    <!-- Theme color for browser chrome -->
+    <meta name="theme-color" content="#667eea">
+
+    <!-- iOS specific meta tags -->
+    <meta name="apple-mobile-web-app-capable" content="yes">
+    <meta name="apple-mobile-web-app-status-bar-style" content="black-translucent">
+    <meta name="apple-mobile-web-app-title" content="AI Research">
+
+    <!-- Icons -->
+    <link rel="icon" type="image/png" sizes="192x192" href="icon-192.png">
+    <link rel="icon" type="image/png" sizes="512x512" href="icon-512.png">
+    <link rel="apple-touch-icon" href="apple-touch-icon.png">
+    <link rel="stylesheet" href="$stylesheet">
 </head>
 <body>
     <div class="container">
@@ -294,78 +246,474 @@ def main():
         </header>
 
         <div class="stats">
-            <strong>{len(projects)}</strong> research projects
+            <strong>$project_count</strong> research projects
+            <input id="search" class="search-box" type="search" placeholder="Search projects..." aria-label="Search projects">
         </div>
 
         <div class="projects-grid">
-"""
-
-    # Add project cards
-    for i, project in enumerate(projects):
-        # Escape HTML in summary
-        summary_text = html.escape(project['summary']) if project['summary'] else "Research project - see README for details."
-
-        # Truncate long summaries
-        if len(summary_text) > 300:
-            summary_text = summary_text[:297] + "..."
-
-        date_str = project['date'].strftime('%Y-%m-%d')
-
-        # Show "New" badge for the most recent project
-        badge = '<div class="badge">New</div>' if i == 0 else ''
-
-        # Build links
-        links = []
-        if project['has_index']:
-            links.append(f'<a href="{project["name"]}/index.html" class="btn btn-primary">🚀 Launch Tool</a>')
-        if project['has_readme']:
-            links.append(f'<a href="{project["name"]}/README.md" class="btn btn-secondary">📖 Docs</a>')
-
-        if github_origin:
-            links.append(f'<a href="{github_origin}/tree/main/{project["name"]}" class="btn btn-secondary" target="_blank">💻 Code</a>')
+""")
 
-        links_html = '\n                    '.join(links) if links else '<a href="{}" class="btn btn-secondary">📁 View Folder</a>'.format(project["name"])
+# A card's data-id is its manifest position, so it is filled in when the card is emitted
+CARD_START = Template("""            <div class="project-card" data-id="$id">""")
 
-        html_content += f"""            <div class="project-card">
-                {badge}
-                <div class="project-icon">{project['icon']}</div>
-                <h2 class="project-title">{html.escape(project['name'])}</h2>
-                <div class="project-date">{date_str}</div>
+CARD_BODY = Template("""
+                $badge
+                <div class="project-icon">$icon</div>
+                <h2 class="project-title">$name</h2>
+                <div class="project-date">$date</div>
                 <p class="project-description">
-                    {summary_text}
+                    $summary
                 </p>
                 <div class="project-links">
-                    {links_html}
+                    $links
                 </div>
             </div>
 
-"""
+""")
+
+GRID_END = """        </div>
 
-    # Close HTML
-    html_content += f"""        </div>
+"""
 
-        <footer>
+PAGE_FOOTER = """        <footer>
             <p><strong>About These Projects</strong></p>
             <p style="margin-top: 10px;">Every line of code and documentation was written by Large Language Models (primarily Claude). This showcases the current capabilities of AI in autonomous research and development.</p>"""
 
-    if github_origin:
-        html_content += f"""
+GITHUB_LINK = Template("""
             <p style="margin-top: 20px;">
-                <a href="{github_origin}" target="_blank">View on GitHub</a>
-            </p>"""
-
-    html_content += """
+                <a href="$origin" target="_blank">View on GitHub</a>
+            </p>""")
+
+# Filters cards with the prebuilt search index, matching each query word as a token prefix
+# Query words are filtered with the index's stopwords and minimum length, as tokenize() does
+SEARCH_SCRIPT = Template("""        <script>
+            (function () {
+                const input = document.getElementById('search');
+                const grid = document.querySelector('.projects-grid');
+                let index = null;
+
+                async function loadIndex() {
+                    if (!index) {
+                        const response = await fetch('$search_index');
+                        index = await response.json();
+                    }
+                    return index;
+                }
+
+                function firstTokenAtOrAfter(tokens, prefix) {
+                    let lo = 0;
+                    let hi = tokens.length;
+                    while (lo < hi) {
+                        const mid = (lo + hi) >> 1;
+                        if (tokens[mid] < prefix) lo = mid + 1;
+                        else hi = mid;
+                    }
+                    return lo;
+                }
+
+                function matchPrefix(idx, prefix) {
+                    const ids = new Set();
+                    for (let i = firstTokenAtOrAfter(idx.tokens, prefix);
+                         i < idx.tokens.length && idx.tokens[i].startsWith(prefix); i++) {
+                        let id = 0;
+                        for (const delta of idx.postings[i]) {
+                            id += delta;
+                            ids.add(id);
+                        }
+                    }
+                    return ids;
+                }
+
+                input.addEventListener('input', async () => {
+                    const query = input.value;
+                    const words = query.toLowerCase().match(/[a-z0-9]+/g) || [];
+                    let matches = null;
+                    if (words.length) {
+                        const idx = await loadIndex();
+                        const terms = words.filter((word) => word.length > 1 && !idx.stopwords.includes(word));
+                        for (const term of terms) {
+                            const ids = matchPrefix(idx, term);
+                            matches = matches ? new Set([...matches].filter((id) => ids.has(id))) : ids;
+                        }
+                        if (window.loadAllShards) await window.loadAllShards();
+                    }
+                    if (query !== input.value) return;
+                    for (const card of grid.querySelectorAll('.project-card')) {
+                        card.style.display = !matches || matches.has(Number(card.dataset.id)) ? '' : 'none';
+                    }
+                });
+            })();
+        </script>
+
+""")
+
+# Fetches older project cards from JSON shards as the user scrolls
+SHARD_LOADER = Template("""        <div id="load-more" class="stats">Loading more projects...</div>
+        <script>
+            (function () {
+                const grid = document.querySelector('.projects-grid');
+                const sentinel = document.getElementById('load-more');
+                let shards = null;
+                let queue = Promise.resolve();
+
+                function loadNextShard() {
+                    queue = queue.then(async () => {
+                        if (!shards) {
+                            const response = await fetch('$shard_manifest');
+                            shards = (await response.json()).shards.slice().reverse();
+                        }
+                        const shard = shards.shift();
+                        if (shard) {
+                            const response = await fetch(shard.url);
+                            const data = await response.json();
+                            grid.insertAdjacentHTML('beforeend', data.cards.join(''));
+                        }
+                        if (!shards.length) {
+                            observer.disconnect();
+                            sentinel.remove();
+                        }
+                    });
+                    return queue;
+                }
+
+                // Search needs every card in the page before it can filter
+                window.loadAllShards = async function () {
+                    do {
+                        await loadNextShard();
+                    } while (shards.length);
+                };
+
+                const observer = new IntersectionObserver((entries) => {
+                    if (entries[0].isIntersecting) loadNextShard();
+                }, { rootMargin: '600px' });
+                observer.observe(sentinel);
+            })();
+        </script>
+
+""")
+
+PAGE_END = """
         </footer>
     </div>
+
+    <!-- Service Worker Registration -->
+    <script>
+        if ('serviceWorker' in navigator) {
+            window.addEventListener('load', () => {
+                navigator.serviceWorker.register('/research/sw.js')
+                    .then((registration) => {
+                        console.log('ServiceWorker registration successful:', registration.scope);
+                    })
+                    .catch((error) => {
+                        console.log('ServiceWorker registration failed:', error);
+                    });
+            });
+        }
+    </script>
 </body>
 </html>
 """
 
-    # Write to index.html
-    with open('index.html', 'w') as f:
-        f.write(html_content)
+def render_card(project, github_origin, is_newest=False):
+    """Render one project card after its CARD_START tag, which carries the position-dependent data-id"""
+    # Escape HTML in summary
+    summary_text = html.escape(project['summary']) if project['summary'] else "Research project - see README for details."
+
+    # Truncate long summaries
+    if len(summary_text) > 300:
+        summary_text = summary_text[:297] + "..."
+
+    date_str = datetime.fromisoformat(project['date']).strftime('%Y-%m-%d')
+
+    # Show "New" badge for the most recent project
+    badge = '<div class="badge">New</div>' if is_newest else ''
 
-    print(f"Generated index.html with {len(projects)} projects")
+    # Build links
+    links = []
+    if project['has_index']:
+        links.append(f'<a href="{project["name"]}/index.html" class="btn btn-primary">🚀 Launch Tool</a>')
+    if project['has_readme']:
+        links.append(f'<a href="{project["name"]}/README.md" class="btn btn-secondary">📖 Docs</a>')
+
+    if github_origin:
+        links.append(f'<a href="{github_origin}/tree/main/{project["name"]}" class="btn btn-secondary" target="_blank">💻 Code</a>')
+
+    links_html = '\n                    '.join(links) if links else '<a href="{}" class="btn btn-secondary">📁 View Folder</a>'.format(project["name"])
+
+    return CARD_BODY.substitute(
+        badge=badge,
+        icon=project['icon'],
+        name=html.escape(project['name']),
+        date=date_str,
+        summary=summary_text,
+        links=links_html
+    )
+
+def render_page(projects, github_origin, stylesheet, page_size=None, cards=None):
+    """Yield index.html in chunks: header, one chunk per project card, footer
+
+    With page_size set only the newest page_size cards are inlined and the
+    rest are fetched from the shard manifest on scroll. Card bodies from
+    render_card, in manifest order, can be passed in to skip rendering.
+    """
+    yield PAGE_HEADER.substitute(project_count=len(projects), stylesheet=stylesheet)
+    inline = projects if page_size is None else projects[:page_size]
+    for i, project in enumerate(inline):
+        yield CARD_START.substitute(id=i) + (
+            cards[i] if cards else render_card(project, github_origin, is_newest=(i == 0)))
+    yield GRID_END
+    yield SEARCH_SCRIPT.substitute(search_index=SEARCH_INDEX_PATH)
+    if len(inline) < len(projects):
+        yield SHARD_LOADER.substitute(shard_manifest=SHARD_MANIFEST_PATH)
+    yield PAGE_FOOTER
+    if github_origin:
+        yield GITHUB_LINK.substitute(origin=github_origin)
+    yield PAGE_END
+
+def write_shards(projects, github_origin, page_size, shard_size, cards=None):
+    """Write older projects as JSON shards of rendered cards plus a shard manifest
+
+    Shards are numbered from the oldest project so that adding projects only
+    changes the newest shard; unchanged shards keep their bytes and mtime.
+    Returns the number of files written.
+    """
+    older = list(enumerate(projects))[page_size:][::-1]
+    os.makedirs(DATA_DIR, exist_ok=True)
+
+    shards = []
+    written = 0
+    for number, start in enumerate(range(0, len(older), shard_size)):
+        # Cards within a shard are newest first, matching the page order
+        chunk = older[start:start + shard_size][::-1]
+        path = os.path.join(DATA_DIR, f'shard-{number:04d}.json')
+        content = json.dumps({
+            'cards': [
+                CARD_START.substitute(id=project_id) + (
+                    cards[project_id] if cards else render_card(project, github_origin))
+                for project_id, project in chunk
+            ]
+        }, ensure_ascii=False)
+        written += write_if_changed(path, [content])
+        shards.append({'url': path, 'count': len(chunk)})
+
+    # Remove shards left over from a larger tree or a bigger shard size
+    current = {os.path.basename(shard['url']) for shard in shards}
+    for name in os.listdir(DATA_DIR):
+        if name.startswith('shard-') and name.removesuffix('.gz') not in current:
+            os.unlink(os.path.join(DATA_DIR, name))
+
+    written += write_if_changed(SHARD_MANIFEST_PATH, [json.dumps({
+        'total': len(projects),
+        'page_size': page_size,
+        'shard_size': shard_size,
+        'shards': shards
+    }, indent=2)])
+    return written
+
+def build_search_index(projects):
+    """Invert each project's search tokens into sorted tokens and delta-encoded posting lists
+
+    Project ids are positions in the manifest order, matching the data-id of
+    each card. Sorted tokens let the page find every token with a given
+    prefix by binary search. The stopwords are included so the page drops
+    the same query words that tokenize() drops from the index.
+    """
+    postings = {}
+    for project_id, project in enumerate(projects):
+        for token in project['tokens']:
+            postings.setdefault(token, []).append(project_id)
+
+    tokens = sorted(postings)
+    encoded = []
+    for token in tokens:
+        ids = postings[token]
+        encoded.append([ids[0]] + [b - a for a, b in zip(ids, ids[1:])])
+    return {'tokens': tokens, 'postings': encoded, 'stopwords': sorted(STOPWORDS)}
+
+def file_digest(path):
+    """Return the SHA-256 of a file, or None if it does not exist"""
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 16), b''):
+                digest.update(block)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()
+
+def write_if_changed(path, chunks):
+    """Stream str or bytes chunks to a temp file and atomically replace path only if the content differs
+
+    Returns True if path was written. An unchanged file keeps its mtime, so
+    it produces no diff, commit or service worker cache invalidation.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    digest = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix=os.path.splitext(path)[1])
+    try:
+        with os.fdopen(fd, 'wb', buffering=1 << 16) as f:
+            for chunk in chunks:
+                data = chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+                digest.update(data)
+                f.write(data)
+        if digest.hexdigest() == file_digest(path):
+            os.unlink(tmp_path)
+            return False
+        if os.path.exists(path):
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o777)
+        else:
+            os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+        return True
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+def write_stylesheet():
+    """Write PAGE_CSS under a name containing its content hash and remove older versions
+
+    Returns the stylesheet path.
+    """
+    data = PAGE_CSS.encode('utf-8')
+    path = os.path.join(DATA_DIR, f"style.{hashlib.sha256(data).hexdigest()[:12]}.css")
+    write_if_changed(path, [data])
+    for name in os.listdir(DATA_DIR):
+        if name.startswith('style.') and name.removesuffix('.gz') != os.path.basename(path):
+            os.unlink(os.path.join(DATA_DIR, name))
+    return path
+
+def inlined_page_size(page_path, stylesheet):
+    """Return the byte size of a rendered page with its stylesheet link replaced by an inline <style> block
+
+    The styles are indented as they were when PAGE_CSS was inlined in the header.
+    """
+    with open(page_path, 'rb') as f:
+        page = f.read()
+    css = ''.join(f"        {line}" if line.strip() else line for line in PAGE_CSS.splitlines(keepends=True))
+    link = f'<link rel="stylesheet" href="{stylesheet}">'.encode('utf-8')
+    return len(page.replace(link, f"<style>\n{css}    </style>".encode('utf-8'), 1))
+
+def precompress(paths):
+    """Write a deterministic maximum-level gzip copy next to each file
+
+    The gzip header carries no name or timestamp, so unchanged input gives
+    byte-identical output. Existing .gz files that already match are not
+    touched, which keeps project directory mtimes stable. Returns the total
+    (raw, compressed) byte sizes.
+    """
+    raw_total = 0
+    compressed_total = 0
+    for path in paths:
+        with open(path, 'rb') as f:
+            data = f.read()
+        compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        raw_total += len(data)
+        compressed_total += len(compressed)
+        gz_path = path + '.gz'
+        if file_digest(gz_path) != hashlib.sha256(compressed).hexdigest():
+            write_if_changed(gz_path, [compressed])
+    return raw_total, compressed_total
+
+def write_precache_manifest(projects, stylesheet, digests=None):
+    """Write the service worker's precache manifest of asset paths to content hashes
+
+    The service worker refetches only assets whose hash changed and drops
+    any that are no longer listed. digests can map asset paths to hashes
+    from an earlier call and is filled in as files are hashed, so a caller
+    that drops the entries of changed files avoids re-reading the rest;
+    index.html is always re-hashed. Returns True if the manifest changed.
+    """
+    if digests is None:
+        digests = {}
+    paths = ['index.html', stylesheet] + PRECACHE_ASSETS + [
+        f"{project['name']}/index.html" for project in projects if project['has_index']
+    ]
+    assets = {}
+    for path in paths:
+        if path == 'index.html' or path not in digests:
+            digests[path] = file_digest(path)
+        digest = digests[path]
+        if digest:
+            assets[path] = digest[:16]
+    # The scope root serves index.html
+    assets['./'] = assets['index.html']
+    return write_if_changed(PRECACHE_MANIFEST_PATH, [json.dumps({
+        'version': 1,
+        'assets': dict(sorted(assets.items()))
+    }, indent=2)])
+
+def build_index(args):
+    """Render index.html and its data files from the project manifest"""
+    with instrumentation.phase('manifest'):
+        manifest = load_manifest(args.manifest, workers=args.workers)
+    github_origin = manifest['origin']
+    projects = manifest['projects']
+
+    # Same summary cache check as the README cog block, without calling the LLM
+    with instrumentation.phase('summary_check'):
+        hits, misses, _ = check_summaries(projects, pathlib.Path.cwd(), load_summary_index())
+    print(f"Summary cache: {len(hits)} up to date, {len(misses)} missing or stale")
+
+    os.makedirs(DATA_DIR, exist_ok=True)
+    stylesheet = write_stylesheet()
+
+    with instrumentation.phase('search_index'):
+        search_index = json.dumps(build_search_index(projects), separators=(',', ':'))
+        write_if_changed(SEARCH_INDEX_PATH, [search_index])
+    print(f"Search index: {len(search_index.encode('utf-8'))} bytes for {len(projects)} projects")
+
+    page_size = None
+    if args.sharded:
+        page_size = args.page_size
+        with instrumentation.phase('shards'):
+            written = write_shards(projects, github_origin, args.page_size, args.shard_size)
+        print(f"Wrote {written} changed shard files to {DATA_DIR}/")
+
+    with instrumentation.phase('render_write'):
+        changed = write_if_changed('index.html', render_page(projects, github_origin, stylesheet, page_size))
+    if changed:
+        print(f"Generated index.html with {len(projects)} projects")
+    else:
+        print(f"index.html with {len(projects)} projects is unchanged")
+
+    with instrumentation.phase('precache_manifest'):
+        if write_precache_manifest(projects, stylesheet):
+            print(f"Updated {PRECACHE_MANIFEST_PATH}")
+
+    page_bytes = os.path.getsize('index.html')
+    css_bytes = os.path.getsize(stylesheet)
+    print(f"index.html: {page_bytes} bytes plus shared stylesheet {stylesheet}: {css_bytes} bytes "
+          f"({inlined_page_size('index.html', stylesheet)} bytes with the styles inlined)")
+
+    if args.precompress:
+        paths = ['index.html', PRECACHE_MANIFEST_PATH] + sorted(
+            os.path.join(DATA_DIR, name) for name in os.listdir(DATA_DIR)
+            if not name.endswith('.gz')
+        ) + [f"{project['name']}/index.html" for project in projects if project['has_index']]
+        with instrumentation.phase('precompress'):
+            raw_total, compressed_total = precompress(paths)
+        print(f"Precompressed {len(paths)} files: {raw_total} -> {compressed_total} bytes "
+              f"({compressed_total / raw_total:.0%})")
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate index.html for the research repository")
+    parser.add_argument('--manifest', default=os.environ.get('PROJECT_MANIFEST'),
+                        help="Project manifest to render (default: run discovery)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Number of threads used to scan project directories")
+    parser.add_argument('--sharded', action='store_true',
+                        help="Inline only the newest projects and load the rest from JSON shards")
+    parser.add_argument('--page-size', type=int, default=50,
+                        help="Projects inlined in index.html in sharded mode")
+    parser.add_argument('--shard-size', type=int, default=200,
+                        help="Projects per JSON shard in sharded mode")
+    parser.add_argument('--precompress', action='store_true',
+                        help="Also write gzip -9 copies (.gz) of index.html, its data files and project pages")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+
+    instrumentation.run(build_index, args)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Opt-in timing instrumentation for the index pipeline
+Records per-phase and per-project timings plus every subprocess call while enabled; all hooks are no-ops otherwise
+"""
+import cProfile
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+_lock = threading.Lock()
+_report = None
+
+def enable():
+    """Start recording timings"""
+    global _report
+    _report = {
+        'started': time.perf_counter(),
+        'phases': {},
+        'projects': [],
+        'subprocesses': []
+    }
+
+def is_enabled():
+    """Check whether timings are being recorded"""
+    return _report is not None
+
+@contextmanager
+def phase(name):
+    """Time a pipeline phase; repeated phases accumulate"""
+    if _report is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        with _lock:
+            _report['phases'][name] = _report['phases'].get(name, 0.0) + elapsed
+
+@contextmanager
+def subprocess_call(command):
+    """Time one subprocess call"""
+    if _report is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        with _lock:
+            _report['subprocesses'].append({'command': ' '.join(command), 'seconds': elapsed})
+
+def record_project(name, seconds):
+    """Record the time spent scanning one project directory"""
+    if _report is None:
+        return
+    with _lock:
+        _report['projects'].append({'name': name, 'seconds': seconds})
+
+def build_report(slowest=10):
+    """Summarize recorded timings, slowest first"""
+    subprocesses = sorted(_report['subprocesses'], key=lambda call: call['seconds'], reverse=True)
+    projects = sorted(_report['projects'], key=lambda project: project['seconds'], reverse=True)
+    return {
+        'total_seconds': time.perf_counter() - _report['started'],
+        'phases': _report['phases'],
+        'subprocesses': {
+            'count': len(subprocesses),
+            'total_seconds': sum(call['seconds'] for call in subprocesses),
+            'slowest': subprocesses[:slowest]
+        },
+        'projects': {
+            'count': len(projects),
+            'total_seconds': sum(project['seconds'] for project in projects),
+            'timings': projects
+        }
+    }
+
+def write_report(path, slowest=10):
+    """Write the timing report as JSON and return it"""
+    report = build_report(slowest)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    return report
+
+def add_arguments(parser):
+    """Add the --timing-report and --cprofile options to a pipeline script's parser"""
+    parser.add_argument('--timing-report', metavar='PATH',
+                        help="Write per-phase, per-project and subprocess timings as JSON")
+    parser.add_argument('--cprofile', metavar='PATH',
+                        help="Write a cProfile dump of the run (view with python -m pstats)")
+
+def run(func, args):
+    """Call func(args) with the --timing-report and --cprofile options applied
+
+    cProfile only records the thread it runs in, so a profiled run sets
+    args.workers to 1, which makes discovery scan projects and walk git
+    history in the calling thread.
+    """
+    if args.timing_report:
+        enable()
+
+    if args.cprofile:
+        args.workers = 1
+        profiler = cProfile.Profile()
+        profiler.runcall(func, args)
+        profiler.dump_stats(args.cprofile)
+        print(f"Wrote cProfile dump to {args.cprofile}")
+    else:
+        func(args)
+
+    if args.timing_report:
+        report = write_report(args.timing_report)
+        print(f"Wrote timing report to {args.timing_report}: {report['total_seconds']:.3f}s total, "
+              f"{report['subprocesses']['count']} subprocesses")
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Build the project manifest for the research repository
+Discovers all research project directories once per build and records each project's
+name, first commit date, summary, file flags, icon and search tokens, for README.md and index.html to render from
+"""
+import os
+import subprocess
+import pathlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import argparse
+import hashlib
+import json
+import re
+import time
+
+import instrumentation
+
+MANIFEST_PATH = '.project-manifest.json'
+MANIFEST_VERSION = 1
+CACHE_PATH = '.index-cache.json'
+CACHE_VERSION = 3
+GIT_DATES_PATH = '.git-dates.json'
+GIT_DATES_VERSION = 2
+# Directories written by the build (generate_index.py output, Python bytecode) rather than research projects
+GENERATED_DIRS = {'index-data', '__pycache__'}
+# Words too common to be worth a posting list in the search index
+STOPWORDS = {
+    'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'is',
+    'it', 'its', 'of', 'on', 'or', 'that', 'the', 'this', 'to', 'with'
+}
+
+def get_git_date(dirname):
+    """Get the first commit date for a directory"""
+    try:
+        command = ['git', 'log', '--diff-filter=A', '--follow', '--format=%aI', '--reverse', '--', dirname]
+        with instrumentation.subprocess_call(command):
+            result = subprocess.run(
+                command,
+                capture_output=True,
+                text=True,
+                timeout=5
+            )
+        if result.returncode == 0 and result.stdout.strip():
+            date_str = result.stdout.strip().split('\n')[0]
+            return datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+    except Exception:
+        pass
+    return None
+
+def get_git_dates(revision_range=None):
+    """Get the first commit date for every top-level directory in one history pass
+
+    Streams `git log --name-status` once instead of running one `git log` per
+    directory. The log is newest-first, so the last commit seen adding a file
+    under a directory is the same commit `get_git_date` picks with --reverse.
+    Rename detection is off so a `git mv`'d directory shows up as added by
+    the rename commit, as it does for `get_git_date`. Returns None if git fails.
+    """
+    dates = {}
+    command = ['git', '-c', 'core.quotePath=false', 'log', '--diff-filter=A', '--no-renames',
+               '--name-status', '--relative', '--format=%x00%aI']
+    if revision_range:
+        command.append(revision_range)
+    try:
+        with instrumentation.subprocess_call(command):
+            proc = subprocess.Popen(
+                command,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True
+            )
+            date_str = None
+            for line in proc.stdout:
+                line = line.rstrip('\n')
+                if line.startswith('\x00'):
+                    date_str = line[1:]
+                elif line.startswith('A\t') and date_str:
+                    path = line[2:]
+                    if '/' in path:
+                        dates[path.split('/', 1)[0]] = date_str
+            returncode = proc.wait()
+        if returncode != 0:
+            return None
+    except Exception:
+        return None
+    return {
+        dirname: datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+        for dirname, date_str in dates.items()
+    }
+
+def is_git_ancestor(sha, head):
+    """Check whether sha is still reachable from head"""
+    try:
+        command = ['git', 'merge-base', '--is-ancestor', sha, head]
+        with instrumentation.subprocess_call(command):
+            result = subprocess.run(
+                command,
+                capture_output=True,
+                timeout=5
+            )
+        return result.returncode == 0
+    except Exception:
+        return False
+
+def load_git_dates(path=GIT_DATES_PATH):
+    """Get the first commit date for every directory, resuming from a persistent index
+
+    The index stores the commit it was built at. When HEAD has moved forward
+    only the new commits are walked, since they cannot change the first-added
+    date of a directory already in the index. If history was rewritten and the
+    stored commit is no longer an ancestor of HEAD, the index is rebuilt.
+    """
+    head = get_git_head()
+    if not head:
+        return {}
+
+    index = {}
+    try:
+        with open(path, 'r') as f:
+            index = json.load(f)
+        if index.get('version') != GIT_DATES_VERSION:
+            index = {}
+    except (OSError, ValueError):
+        pass
+
+    dates = {
+        name: datetime.fromisoformat(date_str)
+        for name, date_str in index.get('dates', {}).items()
+    }
+    last_head = index.get('head')
+    if last_head != head:
+        if last_head and is_git_ancestor(last_head, head):
+            new_dates = get_git_dates(f'{last_head}..{head}')
+            if new_dates is None:
+                return dates
+            for name, date in new_dates.items():
+                dates.setdefault(name, date)
+        else:
+            dates = get_git_dates()
+            if dates is None:
+                return {}
+
+        try:
+            with open(path, 'w') as f:
+                json.dump({
+                    'version': GIT_DATES_VERSION,
+                    'head': head,
+                    'dates': {name: date.isoformat() for name, date in dates.items()}
+                }, f)
+        except OSError:
+            pass
+    return dates
+
+def get_git_origin():
+    """Get the GitHub origin URL"""
+    try:
+        command = ['git', 'remote', 'get-url', 'origin']
+        with instrumentation.subprocess_call(command):
+            result = subprocess.run(
+                command,
+                capture_output=True,
+                text=True,
+                timeout=2
+            )
+        if result.returncode == 0 and result.stdout.strip():
+            origin = result.stdout.strip()
+            if origin.startswith('git@github.com:'):
+                origin = origin.replace('git@github.com:', 'https://github.com/')
+            if origin.endswith('.git'):
+                origin = origin[:-4]
+            return origin
+    except Exception:
+        pass
+    return None
+
+def get_git_head():
+    """Get the commit SHA of HEAD"""
+    try:
+        command = ['git', 'rev-parse', 'HEAD']
+        with instrumentation.subprocess_call(command):
+            result = subprocess.run(
+                command,
+                capture_output=True,
+                text=True,
+                timeout=2
+            )
+        if result.returncode == 0 and result.stdout.strip():
+            return result.stdout.strip()
+    except Exception:
+        pass
+    return None
+
+def load_cache(path):
+    """Load the project metadata cache, or an empty one if missing or stale"""
+    try:
+        with open(path, 'r') as f:
+            cache = json.load(f)
+        if cache.get('version') == CACHE_VERSION:
+            return cache
+    except (OSError, ValueError):
+        pass
+    return {}
+
+def save_cache(path, cache):
+    """Write the project metadata cache"""
+    try:
+        with open(path, 'w') as f:
+            json.dump(cache, f)
+    except OSError:
+        pass
+
+def scan_project(path, cached=None):
+    """Build a project's cache entry from one directory listing and one stat
+
+    The fingerprint is which of README.md, _summary.md and index.html exist
+    plus the summary hash, so it depends only on content: a fresh checkout,
+    which gives every directory a new mtime, still matches the cache. The
+    cached entry is reused if it matches, with only the mtime refreshed.
+    """
+    with os.scandir(path) as it:
+        names = {entry.name for entry in it}
+
+    summary_bytes = None
+    if '_summary.md' in names:
+        try:
+            with open(os.path.join(path, '_summary.md'), 'rb') as f:
+                summary_bytes = f.read()
+        except OSError:
+            pass
+
+    mtime = os.stat(path).st_mtime
+    fingerprint = {
+        'files': sorted(names & {'README.md', '_summary.md', 'index.html'}),
+        'summary': hashlib.sha1(summary_bytes).hexdigest() if summary_bytes is not None else None
+    }
+    if cached and cached['fingerprint'] == fingerprint:
+        return cached if cached['mtime'] == mtime else {**cached, 'mtime': mtime}
+
+    # Read summary if available, normalizing newlines like a text-mode read
+    summary = None
+    if summary_bytes is not None:
+        summary = summary_bytes.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n').strip()
+
+    return {
+        'fingerprint': fingerprint,
+        'mtime': mtime,
+        'summary': summary,
+        'has_readme': 'README.md' in names,
+        'has_index': 'index.html' in names,
+        'tokens': tokenize(f"{os.path.basename(path)} {summary or ''}")
+    }
+
+def tokenize(text):
+    """Split text into sorted, unique, lowercase search tokens"""
+    return sorted({
+        token for token in re.findall(r'[a-z0-9]+', text.lower())
+        if len(token) > 1 and token not in STOPWORDS
+    })
+
+def get_project_icon(dirname):
+    """Return an icon emoji based on directory name keywords"""
+    name_lower = dirname.lower()
+    if 'git' in name_lower or 'version' in name_lower:
+        return '🃏'
+    elif 'money' in name_lower or 'finance' in name_lower or 'lifestyle' in name_lower or 'fire' in name_lower or 'inflat' in name_lower:
+        return '💰'
+    elif 'three' in name_lower or '3d' in name_lower or 'layer' in name_lower or 'quiz' in name_lower:
+        return '🎮'
+    elif 'web' in name_lower or 'html' in name_lower:
+        return '🌐'
+    elif 'data' in name_lower or 'analysis' in name_lower:
+        return '📊'
+    elif 'ai' in name_lower or 'llm' in name_lower or 'gpt' in name_lower:
+        return '🤖'
+    else:
+        return '🔬'
+
+def timed_scan_project(path, cached=None):
+    """Scan a project, recording its duration when instrumentation is enabled"""
+    start = time.perf_counter()
+    entry = scan_project(path, cached)
+    instrumentation.record_project(os.path.basename(path), time.perf_counter() - start)
+    return entry
+
+def timed_load_git_dates():
+    """Load git dates as a timed phase"""
+    with instrumentation.phase('git_dates'):
+        return load_git_dates()
+
+def build_manifest(workers=None):
+    """Discover all projects and return the manifest, newest project first
+
+    With workers=1 projects are scanned and git history is walked in the
+    calling thread, so a profiler attached to it sees all of the work.
+    """
+    research_dir = pathlib.Path.cwd()
+    github_origin = get_git_origin()
+
+    # Reuse cached metadata for projects whose fingerprint is unchanged
+    with instrumentation.phase('load_cache'):
+        cached_projects = load_cache(CACHE_PATH).get('projects', {})
+
+    with os.scandir(research_dir) as it:
+        names = sorted(
+            entry.name for entry in it
+            if entry.is_dir() and not entry.name.startswith('.')
+            and entry.name not in GENERATED_DIRS
+        )
+
+    # Scan project directories concurrently while git history is walked
+    with instrumentation.phase('scan_projects'):
+        if workers == 1:
+            git_dates = timed_load_git_dates()
+            entries = [timed_scan_project(research_dir / name, cached_projects.get(name)) for name in names]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                git_dates_future = executor.submit(timed_load_git_dates)
+                entries = list(executor.map(
+                    lambda name: timed_scan_project(research_dir / name, cached_projects.get(name)),
+                    names
+                ))
+                git_dates = git_dates_future.result()
+
+    # Collect all subdirectories with metadata
+    projects = []
+    project_cache = {}
+    for name, entry in zip(names, entries):
+        project_cache[name] = entry
+
+        # Get commit date or fallback to mtime
+        commit_date = git_dates.get(name)
+        if not commit_date:
+            commit_date = datetime.fromtimestamp(entry['mtime'], tz=timezone.utc)
+
+        projects.append({
+            'name': name,
+            'date': commit_date,
+            'summary': entry['summary'],
+            'has_readme': entry['has_readme'],
+            'has_index': entry['has_index'],
+            'icon': get_project_icon(name),
+            'tokens': entry['tokens']
+        })
+
+    with instrumentation.phase('save_cache'):
+        save_cache(CACHE_PATH, {
+            'version': CACHE_VERSION,
+            'projects': project_cache
+        })
+
+    # Sort by date, newest first
+    projects.sort(key=lambda x: x['date'], reverse=True)
+    for project in projects:
+        project['date'] = project['date'].isoformat()
+
+    return {
+        'version': MANIFEST_VERSION,
+        'origin': github_origin,
+        'projects': projects
+    }
+
+def write_manifest(manifest, path=MANIFEST_PATH):
+    """Write the manifest as JSON"""
+    with open(path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+def load_manifest(path=None, workers=None):
+    """Read the manifest written earlier in this build, or run discovery if no path is given"""
+    if path:
+        with open(path, 'r') as f:
+            return json.load(f)
+    return build_manifest(workers=workers)
+
+def build_and_write_manifest(args):
+    """Run discovery and write the manifest file"""
+    manifest = build_manifest(workers=args.workers)
+    write_manifest(manifest, args.output)
+    print(f"Wrote {args.output} with {len(manifest['projects'])} projects")
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the project manifest for the research repository")
+    parser.add_argument('--output', default=MANIFEST_PATH, help="Manifest file to write")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Number of threads used to scan project directories")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+
+    instrumentation.run(build_and_write_manifest, args)
+
+if __name__ == '__main__':
+    main()
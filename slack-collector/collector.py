@@ -16,8 +16,10 @@ from dotenv import load_dotenv
 load_dotenv()
 
 import argparse
+import sqlite3
 import sys
 import time
+from datetime import datetime, timezone
 from typing import Optional
 
 try:
@@ -29,6 +31,7 @@ except ImportError:
 
 from config import Config
 from database import SlackDatabase
+from export import FORMATS, export_archive
 
 
 class SlackCollector:
@@ -56,10 +59,7 @@ class SlackCollector:
                 response = self.client.users_list(cursor=cursor, limit=200)
                 users = response.get("members", [])
 
-                for user in users:
-                    if not user.get("deleted"):
-                        self.db.upsert_user(user)
-                        count += 1
+                count += self.db.upsert_users([user for user in users if not user.get("deleted")])
 
                 cursor = response.get("response_metadata", {}).get("next_cursor")
                 if not cursor:
@@ -112,9 +112,7 @@ class SlackCollector:
                 )
                 channels = response.get("channels", [])
 
-                for channel in channels:
-                    self.db.upsert_channel(channel)
-                    count += 1
+                count += self.db.upsert_channels(channels)
 
                 cursor = response.get("response_metadata", {}).get("next_cursor")
                 if not cursor:
@@ -148,9 +146,7 @@ class SlackCollector:
                 )
                 channels = response.get("channels", [])
 
-                for channel in channels:
-                    self.db.upsert_channel(channel)
-                    count += 1
+                count += self.db.upsert_channels(channels)
 
                 cursor = response.get("response_metadata", {}).get("next_cursor")
                 if not cursor:
@@ -213,9 +209,7 @@ class SlackCollector:
                 )
                 channels = response.get("channels", [])
 
-                for channel in channels:
-                    self.db.upsert_channel(channel)
-                    count += 1
+                count += self.db.upsert_channels(channels)
 
                 cursor = response.get("response_metadata", {}).get("next_cursor")
                 if not cursor:
@@ -248,17 +242,31 @@ class SlackCollector:
         else:
             channels = self.db.get_all_channels()
 
+        # High-water marks and interrupted cursors for every channel, in one query
+        sync_states = self.db.get_sync_states()
+
         for channel in channels:
             cid = channel["id"]
             channel_name = channel.get("name", cid)
             channel_type = channel.get("type", "unknown")
+            state = sync_states.get(cid, {})
+
+            count = 0
+            # Finish a pass that was interrupted before starting a new one
+            if state.get("cursor"):
+                count += self._collect_channel_messages(
+                    cid,
+                    oldest=state.get("cursor_oldest"),
+                    cursor=state["cursor"]
+                )
 
-            # Get oldest timestamp if we're doing incremental update
+            # Get oldest timestamp if we're doing incremental update. A resumed
+            # pass only reaches back in time, so the stored high-water mark still holds.
             oldest = None
             if not full_history:
-                oldest = self.db.get_latest_message_ts(cid)
+                oldest = state.get("latest_ts")
 
-            count = self._collect_channel_messages(cid, oldest=oldest)
+            count += self._collect_channel_messages(cid, oldest=oldest)
             if count > 0:
                 print(f"  {channel_name} ({channel_type}): {count} messages")
             total_count += count
@@ -269,11 +277,16 @@ class SlackCollector:
     def _collect_channel_messages(
         self,
         channel_id: str,
-        oldest: Optional[str] = None
+        oldest: Optional[str] = None,
+        cursor: Optional[str] = None
     ) -> int:
-        """Collect messages from a single channel."""
+        """Collect messages from a single channel, starting from cursor if given.
+
+        Thread replies are collected before each page is saved, and the page
+        is saved together with the next cursor, so an interrupted run resumes
+        without gaps. A completed pass clears the cursor.
+        """
         count = 0
-        cursor = None
 
         while True:
             try:
@@ -290,10 +303,6 @@ class SlackCollector:
                 messages = response.get("messages", [])
 
                 for message in messages:
-                    result = self.db.insert_message(channel_id, message)
-                    if result is not None:
-                        count += 1
-
                     # Collect thread replies if present
                     if message.get("reply_count", 0) > 0:
                         thread_count = self._collect_thread_replies(
@@ -303,7 +312,9 @@ class SlackCollector:
                         count += thread_count
 
                 cursor = response.get("response_metadata", {}).get("next_cursor")
+                count += len(self.db.insert_history_page(channel_id, messages, cursor, oldest))
                 if not cursor:
+                    self.db.finish_channel_sync(channel_id)
                     break
 
                 time.sleep(self._rate_limit_delay)
@@ -311,6 +322,11 @@ class SlackCollector:
             except SlackApiError as e:
                 if e.response.get("error") == "ratelimited":
                     self._handle_rate_limit(int(e.response.headers.get("Retry-After", 1)))
+                elif e.response.get("error") == "invalid_cursor" and cursor:
+                    # Saved cursors can expire; restart this pass from its oldest bound
+                    print(f"  Cursor for {channel_id} expired, restarting pass")
+                    self.db.clear_sync_cursor(channel_id)
+                    cursor = None
                 elif e.response.get("error") in ("channel_not_found", "not_in_channel"):
                     print(f"  Skipping {channel_id}: {e.response.get('error')}")
                     break
@@ -339,10 +355,7 @@ class SlackCollector:
                 messages = response.get("messages", [])
 
                 # Skip the first message (parent) as it's already collected
-                for message in messages[1:]:
-                    result = self.db.insert_message(channel_id, message)
-                    if result is not None:
-                        count += 1
+                count += len(self.db.insert_messages(channel_id, messages[1:]))
 
                 cursor = response.get("response_metadata", {}).get("next_cursor")
                 if not cursor:
@@ -382,6 +395,40 @@ class SlackCollector:
         print(f"  Messages: {stats['messages']}")
 
 
+def date_to_ts(date: Optional[str]) -> Optional[str]:
+    """Convert a YYYY-MM-DD date (UTC midnight) to a Slack timestamp."""
+    if not date:
+        return None
+    moment = datetime.strptime(date, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    return f"{moment.timestamp():.6f}"
+
+
+def search(db: SlackDatabase, args):
+    """Print full-text search results for --search."""
+    start = time.perf_counter()
+    try:
+        results = db.search(
+            args.search,
+            channel=args.channel,
+            user=args.user,
+            after=date_to_ts(args.after),
+            before=date_to_ts(args.before),
+            limit=args.limit
+        )
+    except (RuntimeError, sqlite3.OperationalError) as e:
+        print(f"Search failed: {e}")
+        sys.exit(1)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    for result in results:
+        when = datetime.fromtimestamp(float(result["ts"]), tz=timezone.utc).strftime("%Y-%m-%d %H:%M")
+        channel = result["channel_name"] or result["channel_id"]
+        user = result["user_name"] or result["user_id"] or "unknown"
+        print(f"{when}  #{channel}  {user}  (ts {result['ts']})")
+        print(f"    {' '.join(result['snippet'].split())}")
+    print(f"{len(results)} results in {elapsed:.1f} ms")
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Collect Slack messages and store in SQLite"
@@ -407,6 +454,67 @@ def main():
         action="store_true",
         help="Just show database statistics"
     )
+    parser.add_argument(
+        "--recount",
+        action="store_true",
+        help="Rebuild the statistics counters with full table scans"
+    )
+    parser.add_argument(
+        "--migrate-raw-json",
+        action="store_true",
+        help="Re-encode stored raw_json as canonical JSON (zlib-compressed if SLACK_COMPRESS_RAW_JSON=true)"
+    )
+    parser.add_argument(
+        "--vacuum",
+        action="store_true",
+        help="With --migrate-raw-json, VACUUM afterwards so the database file shrinks"
+    )
+    parser.add_argument(
+        "--export",
+        type=str,
+        metavar="DIR",
+        help="Export messages to DIR/<channel>/<YYYY-MM>.<format>.gz, resuming an earlier export"
+    )
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        default="ndjson",
+        help="With --export, output format (default: ndjson)"
+    )
+    parser.add_argument(
+        "--include-raw",
+        action="store_true",
+        help="With --export, include each message's original Slack JSON"
+    )
+    parser.add_argument(
+        "--search",
+        type=str,
+        metavar="QUERY",
+        help="Full-text search collected messages (filter with --channel, --user, --after, --before)"
+    )
+    parser.add_argument(
+        "--user",
+        type=str,
+        help="With --search, only match messages from this user ID"
+    )
+    parser.add_argument(
+        "--after",
+        type=str,
+        metavar="YYYY-MM-DD",
+        help="With --search, only match messages on or after this date"
+    )
+    parser.add_argument(
+        "--before",
+        type=str,
+        metavar="YYYY-MM-DD",
+        help="With --search, only match messages before this date"
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=20,
+        help="With --search, maximum number of results (default: 20)"
+    )
 
     args = parser.parse_args()
 
@@ -422,7 +530,17 @@ def main():
         config.db_path = args.db
 
     # Initialize database
-    db = SlackDatabase(config.db_path)
+    db = SlackDatabase.from_config(config)
+
+    if args.recount:
+        result = db.recount()
+        db.close()
+        print(f"Recounted {config.db_path}")
+        for key in ("users", "channels", "messages"):
+            before, after = result["before"][key], result["after"][key]
+            drift = f" (was {before})" if before != after else ""
+            print(f"  {key.capitalize()}: {after}{drift}")
+        return
 
     if args.stats:
         stats = db.get_stats()
@@ -430,6 +548,48 @@ def main():
         print(f"  Users: {stats['users']}")
         print(f"  Channels: {stats['channels']}")
         print(f"  Messages: {stats['messages']}")
+        channel_stats = db.get_channel_stats()
+        if channel_stats:
+            print("Messages per channel:")
+            for channel in channel_stats:
+                name = channel["channel_name"] or channel["channel_id"]
+                print(f"  {name} ({channel['channel_type'] or 'unknown'}): {channel['messages']}")
+        return
+
+    if args.export:
+        print(f"Exporting {config.db_path} to {args.export} ({args.format}.gz)...")
+        try:
+            result = export_archive(
+                db,
+                args.export,
+                fmt=args.format,
+                channel=args.channel,
+                include_raw=args.include_raw
+            )
+        except KeyboardInterrupt:
+            print("\nInterrupted, rerun the same command to resume")
+            sys.exit(1)
+        finally:
+            db.close()
+        print(f"  Exported {result['rows']:,} messages into {result['partitions']} partitions "
+              f"in {result['seconds']:.1f}s ({result['rows_per_second']:,.0f} rows/sec)")
+        if result["skipped_channels"]:
+            print(f"  Skipped {result['skipped_channels']} channels with nothing new since an earlier run")
+        return
+
+    if args.search:
+        search(db, args)
+        db.close()
+        return
+
+    if args.migrate_raw_json:
+        codec = "zlib" if config.compress_raw_json else "json"
+        print(f"Migrating raw_json to {codec} in {config.db_path}...")
+        result = db.migrate_raw_json(vacuum=args.vacuum)
+        db.close()
+        print(f"  Converted {result['converted']} of {result['rows']} rows ({result['failed']} unparseable)")
+        print(f"  raw_json: {result['bytes_before']:,} -> {result['bytes_after']:,} bytes")
+        print(f"  Database: {result['db_bytes_before']:,} -> {result['db_bytes_after']:,} bytes")
         return
 
     # Run collector
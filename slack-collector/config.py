@@ -16,6 +16,11 @@ class Config:
 
     # Database
     db_path: str = "slack_messages.db"
+    sqlite_synchronous: str = "NORMAL"  # OFF, NORMAL, FULL or EXTRA; NORMAL is durable enough in WAL mode
+    sqlite_cache_size: int = -65536  # Negative is KiB (64 MiB), positive is pages
+    sqlite_mmap_size: int = 268435456  # Bytes of the database file to memory-map (256 MiB)
+    sqlite_readers: int = 4  # Pooled read-only connections
+    compress_raw_json: bool = False  # zlib-compress raw message payloads (not queryable with json_extract)
 
     # Collection settings
     fetch_limit: int = 200  # Messages per API call
@@ -35,6 +40,11 @@ class Config:
         return cls(
             user_token=user_token,
             db_path=os.environ.get("SLACK_DB_PATH", "slack_messages.db"),
+            sqlite_synchronous=os.environ.get("SLACK_SQLITE_SYNCHRONOUS", "NORMAL"),
+            sqlite_cache_size=int(os.environ.get("SLACK_SQLITE_CACHE_SIZE", "-65536")),
+            sqlite_mmap_size=int(os.environ.get("SLACK_SQLITE_MMAP_SIZE", "268435456")),
+            sqlite_readers=int(os.environ.get("SLACK_SQLITE_READERS", "4")),
+            compress_raw_json=os.environ.get("SLACK_COMPRESS_RAW_JSON", "").lower() == "true",
             fetch_limit=int(os.environ.get("SLACK_FETCH_LIMIT", "200")),
             include_archived=os.environ.get("SLACK_INCLUDE_ARCHIVED", "").lower() == "true"
         )
@@ -56,6 +66,19 @@ SLACK_FETCH_LIMIT=200
 
 # Include archived channels (optional, defaults to false)
 SLACK_INCLUDE_ARCHIVED=false
+
+# SQLite tuning (optional); the database always runs in WAL mode
+# synchronous: OFF, NORMAL or FULL (defaults to NORMAL)
+SLACK_SQLITE_SYNCHRONOUS=NORMAL
+# Page cache size, negative values are KiB (defaults to -65536, i.e. 64 MiB)
+SLACK_SQLITE_CACHE_SIZE=-65536
+# Bytes of the database to memory-map (defaults to 268435456, i.e. 256 MiB)
+SLACK_SQLITE_MMAP_SIZE=268435456
+# Read-only connections kept for queries (defaults to 4)
+SLACK_SQLITE_READERS=4
+
+# Store raw message JSON zlib-compressed (optional, defaults to false)
+SLACK_COMPRESS_RAW_JSON=false
 """
     return template
 
@@ -2,25 +2,181 @@
 SQLite database operations for Slack message storage.
 """
 
+import ast
+import json
+import queue
 import sqlite3
+import zlib
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional, Union
+from urllib.parse import quote
+
+# Slack ts strings, epoch seconds or datetimes (naive ones are local time)
+Timestamp = Union[str, float, datetime]
+
+# Compressed raw_json values are BLOBs starting with this codec marker; plain values are JSON TEXT
+ZLIB_MARKER = b"zlib:"
+
+
+def encode_raw_json(message_data: dict, compress: bool = False):
+    """Serialize a message payload as canonical JSON, optionally zlib-compressed.
+
+    Canonical JSON (sorted keys, no whitespace) makes identical payloads
+    byte-identical and keeps uncompressed rows queryable with json_extract.
+    """
+    text = json.dumps(message_data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    if compress:
+        return ZLIB_MARKER + zlib.compress(text.encode("utf-8"), 9)
+    return text
+
+
+def to_ts_us(value: Optional[Timestamp]) -> Optional[int]:
+    """Convert a timestamp to integer microseconds since the epoch, the unit of messages.ts_us."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        value = value.timestamp()
+    return round(float(value) * 1_000_000)
+
+
+def normalize_identity(value: Optional[str]) -> Optional[str]:
+    """Case-fold and trim a user name, display name, real name or email for lookup."""
+    if not value:
+        return None
+    value = value.strip().casefold()
+    return value or None
+
+
+def decode_raw_json(value) -> Optional[dict]:
+    """Decode a stored raw_json value of any codec back into a dict.
+
+    Handles compressed BLOBs, JSON TEXT and the Python repr stored by older
+    versions of the collector.
+    """
+    if value is None:
+        return None
+    if isinstance(value, bytes):
+        if value.startswith(ZLIB_MARKER):
+            value = zlib.decompress(value[len(ZLIB_MARKER):])
+        value = value.decode("utf-8")
+    try:
+        return json.loads(value)
+    except ValueError:
+        return ast.literal_eval(value)
+
+
+def raw_json_size(value) -> int:
+    """Return the stored size in bytes of a raw_json value; text is measured as UTF-8."""
+    return len(value.encode("utf-8")) if isinstance(value, str) else len(value)
 
 
 class SlackDatabase:
     """Manages SQLite database for Slack messages."""
 
-    def __init__(self, db_path: str = "slack_messages.db"):
+    # Rows per multi-row INSERT, keeping bound parameters under SQLite's default limit of 999
+    INSERT_CHUNK_SIZE = 120
+
+    SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+    # Schema migrations, applied in order; the schema version is PRAGMA user_version
+    MIGRATIONS = (
+        "_migration_1_ts_us",
+        "_migration_2_counters",
+        "_migration_3_user_identities",
+    )
+
+    # Identity kinds in the order they win when several users match the same identifier
+    IDENTITY_KINDS = ("name", "email", "display_name", "real_name")
+    MIGRATION_BATCH_SIZE = 10000
+
+    def __init__(
+        self,
+        db_path: str = "slack_messages.db",
+        synchronous: str = "NORMAL",
+        cache_size: int = -65536,
+        mmap_size: int = 268435456,
+        readers: int = 4,
+        compress_raw_json: bool = False
+    ):
+        """Open the database.
+
+        All writes go through one writer connection (self.conn) and reads
+        through a pool of up to `readers` read-only connections. In WAL mode
+        readers see the last committed state without blocking the writer, and
+        the writer never waits for readers. cache_size follows SQLite's
+        convention: negative values are KiB, positive values are pages.
+        With compress_raw_json, new raw payloads are stored zlib-compressed.
+        """
+        synchronous = synchronous.upper()
+        if synchronous not in self.SYNCHRONOUS_MODES:
+            raise ValueError(f"synchronous must be one of {', '.join(self.SYNCHRONOUS_MODES)}")
         self.db_path = Path(db_path)
+        self.synchronous = synchronous
+        self.cache_size = int(cache_size)
+        self.mmap_size = int(mmap_size)
+        self.compress_raw_json = compress_raw_json
+        self._in_memory = str(db_path) == ":memory:"
+        self._readers: queue.Queue = queue.Queue(maxsize=max(readers, 1))
         self.conn: Optional[sqlite3.Connection] = None
         self._init_db()
 
+    @classmethod
+    def from_config(cls, config) -> "SlackDatabase":
+        """Open the database at config.db_path with the configured SQLite settings."""
+        return cls(
+            config.db_path,
+            synchronous=config.sqlite_synchronous,
+            cache_size=config.sqlite_cache_size,
+            mmap_size=config.sqlite_mmap_size,
+            readers=config.sqlite_readers,
+            compress_raw_json=config.compress_raw_json
+        )
+
+    def _apply_pragmas(self, conn: sqlite3.Connection):
+        """Apply the per-connection cache and mmap settings."""
+        conn.execute(f"PRAGMA cache_size = {self.cache_size}")
+        conn.execute(f"PRAGMA mmap_size = {self.mmap_size}")
+
+    def _open_reader(self) -> sqlite3.Connection:
+        """Open a read-only connection for the pool."""
+        uri = f"file:{quote(str(self.db_path.resolve()))}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        self._apply_pragmas(conn)
+        return conn
+
+    @contextmanager
+    def _reader(self):
+        """Borrow a read-only connection from the pool, opening one if none is free."""
+        if self._in_memory:
+            # A private in-memory database is only visible to the writer
+            yield self.conn
+            return
+        try:
+            conn = self._readers.get_nowait()
+        except queue.Empty:
+            conn = self._open_reader()
+        try:
+            yield conn
+        finally:
+            try:
+                self._readers.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
     def _init_db(self):
         """Initialize the database with required tables."""
         self.conn = sqlite3.connect(self.db_path)
         self.conn.row_factory = sqlite3.Row
 
+        # WAL lets readers and the writer proceed concurrently; the mode is stored in the file
+        if not self._in_memory:
+            self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+        self._apply_pragmas(self.conn)
+
         cursor = self.conn.cursor()
 
         # Users table
@@ -82,173 +238,764 @@ class SlackDatabase:
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_messages_ts ON messages(ts)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_messages_user ON messages(user_id)")
 
+        # Per-channel collection progress
+        sync_state_exists = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sync_state'"
+        ).fetchone()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS sync_state (
+                channel_id TEXT PRIMARY KEY,
+                latest_ts TEXT,  -- newest conversations.history ts collected (high-water mark)
+                last_success_at TIMESTAMP,  -- last completed pass over the channel
+                last_thread_sweep_at TIMESTAMP,  -- last pass that also collected thread replies
+                cursor TEXT,  -- next page of an interrupted pass
+                cursor_oldest TEXT,  -- oldest bound the cursor was issued for
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        if not sync_state_exists:
+            # Seed high-water marks from an archive collected before sync_state existed
+            cursor.execute("""
+                INSERT INTO sync_state (channel_id, latest_ts)
+                SELECT channel_id, MAX(ts) FROM messages GROUP BY channel_id
+            """)
+
         self.conn.commit()
 
+        self._migrate()
+        self.has_fts = self._init_fts()
+
+    def _migrate(self):
+        """Apply pending schema migrations in order.
+
+        Each migration must be safe to rerun, since one interrupted partway
+        (e.g. during a batched backfill) runs again on the next open. The
+        version is only bumped once a migration has finished.
+        """
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        for target, name in enumerate(self.MIGRATIONS, start=1):
+            if version >= target:
+                continue
+            getattr(self, name)()
+            self.conn.execute(f"PRAGMA user_version = {target}")
+            self.conn.commit()
+
+    def _migration_1_ts_us(self):
+        """Add messages.ts_us, the ts as integer microseconds, indexed for date-range queries.
+
+        TEXT ts values only order correctly by string comparison while they
+        have the same number of digits, and can't use arithmetic. Existing
+        rows are backfilled in id ranges, one transaction per batch.
+        """
+        columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(messages)")}
+        if "ts_us" not in columns:
+            self.conn.execute("ALTER TABLE messages ADD COLUMN ts_us INTEGER")
+            self.conn.commit()
+
+        max_id = self.conn.execute("SELECT MAX(id) FROM messages").fetchone()[0] or 0
+        for start in range(0, max_id, self.MIGRATION_BATCH_SIZE):
+            with self.conn:
+                self.conn.execute("""
+                    UPDATE messages
+                    SET ts_us = CAST(ROUND(CAST(ts AS REAL) * 1000000) AS INTEGER)
+                    WHERE id > ? AND id <= ? AND ts_us IS NULL
+                """, (start, start + self.MIGRATION_BATCH_SIZE))
+
+        with self.conn:
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_messages_channel_ts_us ON messages(channel_id, ts_us)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_messages_ts_us ON messages(ts_us)")
+
+    def _migration_2_counters(self):
+        """Add trigger-maintained row counts so statistics never scan the tables.
+
+        counters holds the users, channels and messages totals, and
+        channel_message_counts / user_message_counts the per-channel and
+        per-user message counts (messages without a user count under '').
+        Upserts that update an existing row fire no INSERT trigger, so
+        counts stay exact.
+        """
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS counters (
+                    name TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS channel_message_counts (
+                    channel_id TEXT PRIMARY KEY,
+                    count INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS user_message_counts (
+                    user_id TEXT PRIMARY KEY,
+                    count INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            for table in ("users", "channels"):
+                self.conn.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS {table}_count_insert AFTER INSERT ON {table} BEGIN
+                        UPDATE counters SET value = value + 1 WHERE name = '{table}';
+                    END
+                """)
+                self.conn.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS {table}_count_delete AFTER DELETE ON {table} BEGIN
+                        UPDATE counters SET value = value - 1 WHERE name = '{table}';
+                    END
+                """)
+            self.conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS messages_count_insert AFTER INSERT ON messages BEGIN
+                    UPDATE counters SET value = value + 1 WHERE name = 'messages';
+                    INSERT INTO channel_message_counts (channel_id, count) VALUES (new.channel_id, 1)
+                        ON CONFLICT(channel_id) DO UPDATE SET count = count + 1;
+                    INSERT INTO user_message_counts (user_id, count) VALUES (COALESCE(new.user_id, ''), 1)
+                        ON CONFLICT(user_id) DO UPDATE SET count = count + 1;
+                END
+            """)
+            self.conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS messages_count_delete AFTER DELETE ON messages BEGIN
+                    UPDATE counters SET value = value - 1 WHERE name = 'messages';
+                    UPDATE channel_message_counts SET count = count - 1 WHERE channel_id = old.channel_id;
+                    UPDATE user_message_counts SET count = count - 1 WHERE user_id = COALESCE(old.user_id, '');
+                END
+            """)
+            self.conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS messages_count_update AFTER UPDATE OF channel_id, user_id ON messages BEGIN
+                    UPDATE channel_message_counts SET count = count - 1 WHERE channel_id = old.channel_id;
+                    INSERT INTO channel_message_counts (channel_id, count) VALUES (new.channel_id, 1)
+                        ON CONFLICT(channel_id) DO UPDATE SET count = count + 1;
+                    UPDATE user_message_counts SET count = count - 1 WHERE user_id = COALESCE(old.user_id, '');
+                    INSERT INTO user_message_counts (user_id, count) VALUES (COALESCE(new.user_id, ''), 1)
+                        ON CONFLICT(user_id) DO UPDATE SET count = count + 1;
+                END
+            """)
+            self._recount()
+
+    def _migration_3_user_identities(self):
+        """Add the indexed, case-folded user identity lookup table and fill it from users."""
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS user_identities (
+                    identity TEXT NOT NULL,  -- case-folded name, display name, real name or email
+                    kind TEXT NOT NULL,
+                    user_id TEXT NOT NULL,
+                    PRIMARY KEY (identity, kind, user_id)
+                ) WITHOUT ROWID
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_user_identities_user ON user_identities(user_id)")
+            users = self.conn.execute("SELECT id, name, display_name, real_name, email FROM users").fetchall()
+            self._write_identities([dict(user) for user in users])
+
+    def _write_identities(self, users: list):
+        """Replace the identities of the given users, inside the caller's transaction.
+
+        users are dicts with id and the IDENTITY_KINDS columns.
+        """
+        self.conn.executemany(
+            "DELETE FROM user_identities WHERE user_id = ?",
+            [(user["id"],) for user in users]
+        )
+        self.conn.executemany("""
+            INSERT OR IGNORE INTO user_identities (identity, kind, user_id)
+            VALUES (?, ?, ?)
+        """, [
+            (normalize_identity(user[kind]), kind, user["id"])
+            for user in users
+            for kind in self.IDENTITY_KINDS
+            if normalize_identity(user[kind])
+        ])
+
+    def _recount(self):
+        """Recompute every counter from the tables, inside the caller's transaction."""
+        self.conn.execute("DELETE FROM counters")
+        for table in ("users", "channels", "messages"):
+            self.conn.execute(f"INSERT INTO counters (name, value) SELECT '{table}', COUNT(*) FROM {table}")
+        self.conn.execute("DELETE FROM channel_message_counts")
+        self.conn.execute("""
+            INSERT INTO channel_message_counts (channel_id, count)
+            SELECT channel_id, COUNT(*) FROM messages GROUP BY channel_id
+        """)
+        self.conn.execute("DELETE FROM user_message_counts")
+        self.conn.execute("""
+            INSERT INTO user_message_counts (user_id, count)
+            SELECT COALESCE(user_id, ''), COUNT(*) FROM messages GROUP BY COALESCE(user_id, '')
+        """)
+
+    def recount(self) -> dict:
+        """Rebuild all counters with full scans, e.g. after editing the database by hand.
+
+        Returns the counters before and after so drift can be reported.
+        """
+        before = self.get_stats()
+        with self.conn:
+            self._recount()
+        return {"before": before, "after": self.get_stats()}
+
+    def _init_fts(self) -> bool:
+        """Create the FTS5 index over message text, returns False if SQLite lacks FTS5.
+
+        messages_fts is an external-content table, so it stores only the
+        index, and triggers keep it in sync with every insert, update and
+        delete, including the batch insert path. An archive collected before
+        the index existed is indexed once on first open.
+        """
+        exists = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'messages_fts'"
+        ).fetchone()
+        try:
+            with self.conn:
+                self.conn.execute("""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+                        text,
+                        content='messages',
+                        content_rowid='id',
+                        tokenize='unicode61 remove_diacritics 2'
+                    )
+                """)
+                self.conn.execute("""
+                    CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN
+                        INSERT INTO messages_fts(rowid, text) VALUES (new.id, new.text);
+                    END
+                """)
+                self.conn.execute("""
+                    CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN
+                        INSERT INTO messages_fts(messages_fts, rowid, text) VALUES ('delete', old.id, old.text);
+                    END
+                """)
+                self.conn.execute("""
+                    CREATE TRIGGER IF NOT EXISTS messages_fts_update AFTER UPDATE OF text ON messages BEGIN
+                        INSERT INTO messages_fts(messages_fts, rowid, text) VALUES ('delete', old.id, old.text);
+                        INSERT INTO messages_fts(rowid, text) VALUES (new.id, new.text);
+                    END
+                """)
+                if not exists:
+                    self.conn.execute("INSERT INTO messages_fts(messages_fts) VALUES ('rebuild')")
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5
+            return False
+        return True
+
     def upsert_user(self, user_data: dict):
         """Insert or update a user."""
-        cursor = self.conn.cursor()
-        profile = user_data.get("profile", {})
+        self.upsert_users([user_data])
 
-        cursor.execute("""
-            INSERT INTO users (id, name, display_name, real_name, email, is_bot, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(id) DO UPDATE SET
-                name = excluded.name,
-                display_name = excluded.display_name,
-                real_name = excluded.real_name,
-                email = excluded.email,
-                is_bot = excluded.is_bot,
-                updated_at = excluded.updated_at
-        """, (
-            user_data.get("id"),
-            user_data.get("name"),
-            profile.get("display_name"),
-            profile.get("real_name"),
-            profile.get("email"),
-            1 if user_data.get("is_bot") else 0,
-            datetime.now().isoformat()
-        ))
-        self.conn.commit()
+    def upsert_users(self, users: list) -> int:
+        """Insert or update a page of users in one transaction, returns the number written."""
+        now = datetime.now().isoformat()
+        rows = []
+        identities = []
+        for user_data in users:
+            profile = user_data.get("profile", {})
+            rows.append((
+                user_data.get("id"),
+                user_data.get("name"),
+                profile.get("display_name"),
+                profile.get("real_name"),
+                profile.get("email"),
+                1 if user_data.get("is_bot") else 0,
+                now
+            ))
+            identities.append({
+                "id": user_data.get("id"),
+                "name": user_data.get("name"),
+                "display_name": profile.get("display_name"),
+                "real_name": profile.get("real_name"),
+                "email": profile.get("email")
+            })
+
+        with self.conn:
+            self._write_identities(identities)
+            self.conn.executemany("""
+                INSERT INTO users (id, name, display_name, real_name, email, is_bot, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    name = excluded.name,
+                    display_name = excluded.display_name,
+                    real_name = excluded.real_name,
+                    email = excluded.email,
+                    is_bot = excluded.is_bot,
+                    updated_at = excluded.updated_at
+            """, rows)
+        return len(rows)
 
     def upsert_channel(self, channel_data: dict):
         """Insert or update a channel."""
-        cursor = self.conn.cursor()
+        self.upsert_channels([channel_data])
 
-        # Determine channel type
-        if channel_data.get("is_im"):
-            channel_type = "im"
-        elif channel_data.get("is_mpim"):
-            channel_type = "mpim"
-        elif channel_data.get("is_private"):
-            channel_type = "private"
-        else:
-            channel_type = "channel"
+    def upsert_channels(self, channels: list) -> int:
+        """Insert or update a page of channels in one transaction, returns the number written."""
+        now = datetime.now().isoformat()
+        rows = []
+        for channel_data in channels:
+            # Determine channel type
+            if channel_data.get("is_im"):
+                channel_type = "im"
+            elif channel_data.get("is_mpim"):
+                channel_type = "mpim"
+            elif channel_data.get("is_private"):
+                channel_type = "private"
+            else:
+                channel_type = "channel"
 
-        cursor.execute("""
-            INSERT INTO channels (id, name, type, is_private, updated_at)
-            VALUES (?, ?, ?, ?, ?)
-            ON CONFLICT(id) DO UPDATE SET
-                name = excluded.name,
-                type = excluded.type,
-                is_private = excluded.is_private,
-                updated_at = excluded.updated_at
-        """, (
-            channel_data.get("id"),
-            channel_data.get("name", channel_data.get("id")),
-            channel_type,
-            1 if channel_data.get("is_private") else 0,
-            datetime.now().isoformat()
-        ))
-        self.conn.commit()
+            rows.append((
+                channel_data.get("id"),
+                channel_data.get("name", channel_data.get("id")),
+                channel_type,
+                1 if channel_data.get("is_private") else 0,
+                now
+            ))
+
+        with self.conn:
+            self.conn.executemany("""
+                INSERT INTO channels (id, name, type, is_private, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    name = excluded.name,
+                    type = excluded.type,
+                    is_private = excluded.is_private,
+                    updated_at = excluded.updated_at
+            """, rows)
+        return len(rows)
 
     def insert_message(self, channel_id: str, message_data: dict) -> Optional[int]:
         """Insert a message, returns message id or None if duplicate."""
-        cursor = self.conn.cursor()
+        inserted = self.insert_messages(channel_id, [message_data])
+        return inserted[0] if inserted else None
 
-        try:
-            cursor.execute("""
-                INSERT INTO messages (channel_id, user_id, text, ts, thread_ts, message_type, raw_json)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (
-                channel_id,
-                message_data.get("user"),
-                message_data.get("text"),
-                message_data.get("ts"),
-                message_data.get("thread_ts"),
-                message_data.get("type", "message"),
-                str(message_data)
-            ))
-            self.conn.commit()
-            return cursor.lastrowid
-        except sqlite3.IntegrityError:
-            # Duplicate message (same channel_id and ts)
-            return None
+    def insert_messages(self, channel_id: str, messages: list) -> list:
+        """Insert a page of messages in one transaction, returns the ids of newly inserted rows.
+
+        Duplicates (same channel_id and ts) and messages without a ts are
+        skipped.
+        """
+        with self.conn:
+            return self._insert_messages(channel_id, messages)
+
+    def _insert_messages(self, channel_id: str, messages: list) -> list:
+        """Insert messages inside the caller's transaction.
+
+        sqlite3's executemany discards RETURNING rows, so each chunk is one
+        multi-row INSERT and the returned ids are exactly the rows that were new.
+        """
+        rows = [(
+            channel_id,
+            message_data.get("user"),
+            message_data.get("text"),
+            message_data.get("ts"),
+            to_ts_us(message_data.get("ts")),
+            message_data.get("thread_ts"),
+            message_data.get("type", "message"),
+            encode_raw_json(message_data, self.compress_raw_json)
+        ) for message_data in messages if message_data.get("ts")]
+
+        inserted = []
+        for start in range(0, len(rows), self.INSERT_CHUNK_SIZE):
+            chunk = rows[start:start + self.INSERT_CHUNK_SIZE]
+            values = ", ".join(["(?, ?, ?, ?, ?, ?, ?, ?)"] * len(chunk))
+            cursor = self.conn.execute(f"""
+                INSERT INTO messages (channel_id, user_id, text, ts, ts_us, thread_ts, message_type, raw_json)
+                VALUES {values}
+                ON CONFLICT(channel_id, ts) DO NOTHING
+                RETURNING id
+            """, [value for row in chunk for value in row])
+            inserted.extend(row["id"] for row in cursor.fetchall())
+        return inserted
+
+    def insert_history_page(
+        self,
+        channel_id: str,
+        messages: list,
+        next_cursor: Optional[str],
+        oldest: Optional[str]
+    ) -> list:
+        """Insert a conversations.history page and advance the channel's sync state atomically.
+
+        The page's highest ts raises the channel's high-water mark, and
+        next_cursor is saved along with the oldest bound it belongs to, so an
+        interrupted run resumes from the next page instead of leaving a gap.
+        Returns the ids of newly inserted rows.
+        """
+        page_latest = max((m["ts"] for m in messages if m.get("ts")), key=float, default=None)
+        with self.conn:
+            inserted = self._insert_messages(channel_id, messages)
+            self.conn.execute("""
+                INSERT INTO sync_state (channel_id, latest_ts, cursor, cursor_oldest, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(channel_id) DO UPDATE SET
+                    latest_ts = CASE
+                        WHEN sync_state.latest_ts IS NULL
+                          OR CAST(excluded.latest_ts AS REAL) > CAST(sync_state.latest_ts AS REAL)
+                        THEN excluded.latest_ts
+                        ELSE sync_state.latest_ts
+                    END,
+                    cursor = excluded.cursor,
+                    cursor_oldest = excluded.cursor_oldest,
+                    updated_at = excluded.updated_at
+            """, (channel_id, page_latest, next_cursor, oldest if next_cursor else None,
+                  datetime.now().isoformat()))
+        return inserted
+
+    def finish_channel_sync(self, channel_id: str, threads_swept: bool = True):
+        """Record a completed pass over a channel's history and clear its cursor."""
+        now = datetime.now().isoformat()
+        with self.conn:
+            self.conn.execute("""
+                INSERT INTO sync_state (channel_id, last_success_at, last_thread_sweep_at, updated_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(channel_id) DO UPDATE SET
+                    cursor = NULL,
+                    cursor_oldest = NULL,
+                    last_success_at = excluded.last_success_at,
+                    last_thread_sweep_at = COALESCE(excluded.last_thread_sweep_at, sync_state.last_thread_sweep_at),
+                    updated_at = excluded.updated_at
+            """, (channel_id, now, now if threads_swept else None, now))
+
+    def clear_sync_cursor(self, channel_id: str):
+        """Forget a channel's in-progress cursor, e.g. after Slack rejected it."""
+        with self.conn:
+            self.conn.execute("""
+                UPDATE sync_state SET cursor = NULL, cursor_oldest = NULL, updated_at = ?
+                WHERE channel_id = ?
+            """, (datetime.now().isoformat(), channel_id))
+
+    def get_sync_states(self) -> dict:
+        """Get every channel's sync state in one query, keyed by channel ID."""
+        with self._reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM sync_state")
+            return {row["channel_id"]: dict(row) for row in cursor.fetchall()}
 
     def get_latest_message_ts(self, channel_id: str) -> Optional[str]:
         """Get the timestamp of the latest message in a channel."""
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT ts FROM messages
-            WHERE channel_id = ?
-            ORDER BY ts DESC
-            LIMIT 1
-        """, (channel_id,))
-        row = cursor.fetchone()
-        return row["ts"] if row else None
+        with self._reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT ts FROM messages
+                WHERE channel_id = ?
+                ORDER BY ts DESC
+                LIMIT 1
+            """, (channel_id,))
+            row = cursor.fetchone()
+            return row["ts"] if row else None
+
+    def get_raw_message(self, message_id: int) -> Optional[dict]:
+        """Decode one message's original Slack payload on demand."""
+        with self._reader() as conn:
+            row = conn.execute("SELECT raw_json FROM messages WHERE id = ?", (message_id,)).fetchone()
+        return decode_raw_json(row["raw_json"]) if row else None
+
+    def migrate_raw_json(self, compress: Optional[bool] = None, batch_size: int = 1000, vacuum: bool = False) -> dict:
+        """Re-encode every stored raw_json value as canonical JSON, in streaming batches.
+
+        Rows are walked in id order, one batch per transaction, so memory
+        stays bounded and an interrupted migration can simply be rerun.
+        Values that cannot be parsed are left as they are. compress defaults
+        to the database's compress_raw_json setting. Returns row counts plus
+        raw_json and database sizes before and after. Freed pages are reused
+        by later inserts; the file itself only shrinks with vacuum.
+        """
+        if compress is None:
+            compress = self.compress_raw_json
+        stats = {"rows": 0, "converted": 0, "failed": 0, "bytes_before": 0, "bytes_after": 0}
+        stats["db_bytes_before"] = self._used_bytes()
+
+        last_id = 0
+        while True:
+            rows = self.conn.execute("""
+                SELECT id, raw_json FROM messages
+                WHERE id > ?
+                ORDER BY id
+                LIMIT ?
+            """, (last_id, batch_size)).fetchall()
+            if not rows:
+                break
+            last_id = rows[-1]["id"]
+
+            updates = []
+            for row in rows:
+                value = row["raw_json"]
+                if value is None:
+                    continue
+                stats["rows"] += 1
+                stats["bytes_before"] += raw_json_size(value)
+                try:
+                    encoded = encode_raw_json(decode_raw_json(value), compress)
+                except (ValueError, SyntaxError, TypeError, zlib.error):
+                    stats["failed"] += 1
+                    stats["bytes_after"] += raw_json_size(value)
+                    continue
+                stats["bytes_after"] += raw_json_size(encoded)
+                if encoded != value:
+                    updates.append((encoded, row["id"]))
+
+            with self.conn:
+                self.conn.executemany("UPDATE messages SET raw_json = ? WHERE id = ?", updates)
+            stats["converted"] += len(updates)
+
+        if vacuum:
+            self.conn.execute("VACUUM")
+        stats["db_bytes_after"] = self._used_bytes()
+        return stats
+
+    def _used_bytes(self) -> int:
+        """Return the bytes used by the database pages, excluding free pages."""
+        page_size = self.conn.execute("PRAGMA page_size").fetchone()[0]
+        page_count = self.conn.execute("PRAGMA page_count").fetchone()[0]
+        freelist = self.conn.execute("PRAGMA freelist_count").fetchone()[0]
+        return page_size * (page_count - freelist)
+
+    @staticmethod
+    def _fts_query(query: str) -> str:
+        """Turn free text into an FTS5 query matching all words, keeping a trailing * as a prefix search."""
+        terms = []
+        for word in query.split():
+            prefix = word.endswith("*")
+            word = word.rstrip("*").replace('"', '""')
+            if word:
+                terms.append(f'"{word}"' + ("*" if prefix else ""))
+        return " ".join(terms)
+
+    def search(
+        self,
+        query: str,
+        channel: Optional[str] = None,
+        user: Optional[str] = None,
+        before: Optional[Timestamp] = None,
+        after: Optional[Timestamp] = None,
+        limit: int = 20,
+        raw: bool = False
+    ) -> list:
+        """Full-text search over message text, best matches first.
+
+        query is free text in which every word must match, and `word*`
+        matches a prefix; with raw=True it is passed to FTS5 as-is (AND, OR,
+        NOT, NEAR, "phrases"). channel and user are IDs; after is an
+        inclusive and before an exclusive timestamp, like since and until in
+        get_messages. Each result has a snippet with the matched terms in
+        [brackets] and a bm25 rank where lower is better.
+        """
+        if not self.has_fts:
+            raise RuntimeError("SQLite was built without FTS5, full-text search is unavailable")
+        match = query if raw else self._fts_query(query)
+        if not match:
+            return []
+
+        filters = []
+        params = [match]
+        if channel:
+            filters.append("m.channel_id = ?")
+            params.append(channel)
+        if user:
+            filters.append("m.user_id = ?")
+            params.append(user)
+        if before is not None:
+            filters.append("m.ts_us < ?")
+            params.append(to_ts_us(before))
+        if after is not None:
+            filters.append("m.ts_us >= ?")
+            params.append(to_ts_us(after))
+        params.append(limit)
+
+        with self._reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT m.id, m.channel_id, m.user_id, m.ts, m.thread_ts,
+                       u.name as user_name, c.name as channel_name,
+                       snippet(messages_fts, 0, '[', ']', '...', 16) as snippet,
+                       bm25(messages_fts) as rank
+                FROM messages_fts
+                JOIN messages m ON m.id = messages_fts.rowid
+                LEFT JOIN users u ON m.user_id = u.id
+                LEFT JOIN channels c ON m.channel_id = c.id
+                WHERE messages_fts MATCH ?
+                {"".join(" AND " + f for f in filters)}
+                ORDER BY rank
+                LIMIT ?
+            """, params)
+            return [dict(row) for row in cursor.fetchall()]
 
     def get_user_by_name(self, name: str) -> Optional[dict]:
-        """Find a user by name or display name."""
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT * FROM users
-            WHERE name = ? OR display_name = ? OR real_name = ?
-        """, (name, name, name))
-        row = cursor.fetchone()
-        return dict(row) if row else None
+        """Find a user by name, display name, real name or email, ignoring case.
+
+        One lookup on the user_identities primary key. When several users
+        share the identifier, a username match wins over email, display
+        name and real name.
+        """
+        identity = normalize_identity(name)
+        if not identity:
+            return None
+        priority = " ".join(f"WHEN '{kind}' THEN {rank}" for rank, kind in enumerate(self.IDENTITY_KINDS))
+        with self._reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT u.* FROM user_identities i
+                JOIN users u ON u.id = i.user_id
+                WHERE i.identity = ?
+                ORDER BY CASE i.kind {priority} END, u.id
+                LIMIT 1
+            """, (identity,))
+            row = cursor.fetchone()
+            return dict(row) if row else None
 
     def get_user_by_id(self, user_id: str) -> Optional[dict]:
         """Find a user by ID."""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
-        row = cursor.fetchone()
-        return dict(row) if row else None
+        with self._reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
+            row = cursor.fetchone()
+            return dict(row) if row else None
 
     def get_all_users(self) -> list:
         """Get all users."""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM users ORDER BY name")
-        return [dict(row) for row in cursor.fetchall()]
+        with self._reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM users ORDER BY name")
+            return [dict(row) for row in cursor.fetchall()]
 
     def get_all_channels(self) -> list:
         """Get all channels."""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM channels ORDER BY name")
-        return [dict(row) for row in cursor.fetchall()]
+        with self._reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM channels ORDER BY name")
+            return [dict(row) for row in cursor.fetchall()]
 
-    def get_messages(self, channel_id: str = None, limit: int = 100) -> list:
-        """Get messages, optionally filtered by channel."""
-        cursor = self.conn.cursor()
+    def get_messages(
+        self,
+        channel_id: str = None,
+        limit: int = 100,
+        since: Optional[Timestamp] = None,
+        until: Optional[Timestamp] = None
+    ) -> list:
+        """Get the newest messages, optionally filtered by channel and a [since, until) time range."""
+        filters = []
+        params = []
         if channel_id:
-            cursor.execute("""
-                SELECT m.*, u.name as user_name, c.name as channel_name
-                FROM messages m
-                LEFT JOIN users u ON m.user_id = u.id
-                LEFT JOIN channels c ON m.channel_id = c.id
-                WHERE m.channel_id = ?
-                ORDER BY m.ts DESC
-                LIMIT ?
-            """, (channel_id, limit))
-        else:
-            cursor.execute("""
+            filters.append("m.channel_id = ?")
+            params.append(channel_id)
+        if since is not None:
+            filters.append("m.ts_us >= ?")
+            params.append(to_ts_us(since))
+        if until is not None:
+            filters.append("m.ts_us < ?")
+            params.append(to_ts_us(until))
+        params.append(limit)
+
+        with self._reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
                 SELECT m.*, u.name as user_name, c.name as channel_name
                 FROM messages m
                 LEFT JOIN users u ON m.user_id = u.id
                 LEFT JOIN channels c ON m.channel_id = c.id
-                ORDER BY m.ts DESC
+                {"WHERE " + " AND ".join(filters) if filters else ""}
+                ORDER BY m.ts_us DESC
                 LIMIT ?
-            """, (limit,))
-        return [dict(row) for row in cursor.fetchall()]
+            """, params)
+            return [dict(row) for row in cursor.fetchall()]
 
-    def get_stats(self) -> dict:
-        """Get database statistics."""
-        cursor = self.conn.cursor()
+    def iter_messages(
+        self,
+        channel: Optional[str] = None,
+        since: Optional[Timestamp] = None,
+        until: Optional[Timestamp] = None,
+        batch_size: int = 1000,
+        include_raw: bool = False,
+        after: Optional[tuple] = None
+    ) -> Iterator[sqlite3.Row]:
+        """Stream messages oldest first, fetching batch_size rows per query.
 
-        cursor.execute("SELECT COUNT(*) as count FROM users")
-        users_count = cursor.fetchone()["count"]
+        Pages are keyset-paginated on (ts_us, id), so each batch is an index
+        range scan no matter how deep the iteration is, and memory stays at
+        one batch. since is inclusive and until exclusive. after is the
+        (ts_us, id) of a row already seen, to continue an earlier iteration
+        just past it. Rows are sqlite3.Row objects with the user and channel
+        names joined in; raw_json is only read with include_raw.
+        """
+        filters = []
+        params = []
+        if channel:
+            filters.append("m.channel_id = ?")
+            params.append(channel)
+        if since is not None:
+            filters.append("m.ts_us >= ?")
+            params.append(to_ts_us(since))
+        if until is not None:
+            filters.append("m.ts_us < ?")
+            params.append(to_ts_us(until))
+        raw_column = ", m.raw_json" if include_raw else ""
 
-        cursor.execute("SELECT COUNT(*) as count FROM channels")
-        channels_count = cursor.fetchone()["count"]
+        last_ts_us, last_id = after if after else (None, None)
+        while True:
+            keyset = []
+            keyset_params = []
+            if last_ts_us is not None:
+                # Written as a range on ts_us so the (channel_id, ts_us) and ts_us indexes both apply
+                keyset.append("m.ts_us >= ? AND (m.ts_us > ? OR m.id > ?)")
+                keyset_params = [last_ts_us, last_ts_us, last_id]
+            where = " AND ".join(filters + keyset)
+            with self._reader() as conn:
+                rows = conn.execute(f"""
+                    SELECT m.id, m.channel_id, m.user_id, m.text, m.ts, m.ts_us, m.thread_ts, m.message_type{raw_column},
+                           u.name as user_name, u.real_name as user_real_name,
+                           c.name as channel_name, c.type as channel_type
+                    FROM messages m
+                    LEFT JOIN users u ON m.user_id = u.id
+                    LEFT JOIN channels c ON m.channel_id = c.id
+                    {"WHERE " + where if where else ""}
+                    ORDER BY m.ts_us, m.id
+                    LIMIT ?
+                """, params + keyset_params + [batch_size]).fetchall()
+            yield from rows
+            if len(rows) < batch_size:
+                return
+            last_ts_us, last_id = rows[-1]["ts_us"], rows[-1]["id"]
+
+    def get_stats(self) -> dict:
+        """Get database statistics from the trigger-maintained counters."""
+        with self._reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT name, value FROM counters")
+            counts = {row["name"]: row["value"] for row in cursor.fetchall()}
 
-        cursor.execute("SELECT COUNT(*) as count FROM messages")
-        messages_count = cursor.fetchone()["count"]
+            return {
+                "users": counts.get("users", 0),
+                "channels": counts.get("channels", 0),
+                "messages": counts.get("messages", 0)
+            }
 
-        return {
-            "users": users_count,
-            "channels": channels_count,
-            "messages": messages_count
-        }
+    def get_channel_stats(self) -> list:
+        """Get message counts per channel, busiest first."""
+        with self._reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT cc.channel_id, c.name as channel_name, c.type as channel_type, cc.count as messages
+                FROM channel_message_counts cc
+                LEFT JOIN channels c ON cc.channel_id = c.id
+                WHERE cc.count > 0
+                ORDER BY cc.count DESC
+            """)
+            return [dict(row) for row in cursor.fetchall()]
+
+    def get_user_stats(self) -> list:
+        """Get message counts per user, most active first; user_id '' counts messages without a user."""
+        with self._reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT uc.user_id, u.name as user_name, uc.count as messages
+                FROM user_message_counts uc
+                LEFT JOIN users u ON uc.user_id = u.id
+                WHERE uc.count > 0
+                ORDER BY uc.count DESC
+            """)
+            return [dict(row) for row in cursor.fetchall()]
 
     def close(self):
-        """Close the database connection."""
+        """Close the writer and all pooled reader connections."""
         if self.conn:
             self.conn.close()
+        while True:
+            try:
+                self._readers.get_nowait().close()
+            except queue.Empty:
+                break
@@ -0,0 +1,173 @@
+"""
+Streaming export of the Slack archive to gzip-compressed NDJSON or CSV.
+"""
+
+import csv
+import gzip
+import json
+import os
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+from database import SlackDatabase, decode_raw_json
+
+FORMATS = ("ndjson", "csv")
+STATE_FILE = "export-state.json"
+FIELDS = [
+    "id", "channel_id", "channel_name", "channel_type", "user_id", "user_name", "user_real_name",
+    "ts", "thread_ts", "message_type", "text"
+]
+
+
+def month_of(ts: str) -> str:
+    """Return the UTC YYYY-MM a Slack timestamp falls in."""
+    return datetime.fromtimestamp(float(ts), tz=timezone.utc).strftime("%Y-%m")
+
+
+def month_start(month: str) -> str:
+    """Return the Slack timestamp of the first instant of a YYYY-MM month (UTC)."""
+    year, number = map(int, month.split("-"))
+    return f"{datetime(year, number, 1, tzinfo=timezone.utc).timestamp():.6f}"
+
+
+class PartitionWriter:
+    """Write one channel-month partition to a temp file, renamed into place when complete."""
+
+    def __init__(self, path: Path, fmt: str, month: str):
+        self.path = path
+        self.month = month
+        self.tmp_path = path.with_name(path.name + ".part")
+        self.fmt = fmt
+        self.rows = 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.file = gzip.open(self.tmp_path, "wt", compresslevel=6, encoding="utf-8", newline="")
+        if fmt == "csv":
+            self.writer = csv.writer(self.file)
+            self.writer.writerow(FIELDS + ["raw_json"])
+
+    def write(self, record: dict):
+        """Append one message record."""
+        if self.fmt == "csv":
+            raw = record.get("raw")
+            self.writer.writerow(
+                [record[field] for field in FIELDS]
+                + [json.dumps(raw, ensure_ascii=False) if raw is not None else ""]
+            )
+        else:
+            self.file.write(json.dumps(record, ensure_ascii=False))
+            self.file.write("\n")
+        self.rows += 1
+
+    def close(self):
+        """Finish the partition and atomically move it into place."""
+        self.file.close()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        """Drop an unfinished partition."""
+        self.file.close()
+        self.tmp_path.unlink(missing_ok=True)
+
+
+def load_state(path: Path, fmt: str, include_raw: bool) -> dict:
+    """Load the export progress file, or a fresh state if it is missing or was written with other options."""
+    try:
+        state = json.loads(path.read_text())
+        if state.get("format") == fmt and state.get("include_raw") == include_raw:
+            return state
+    except (OSError, ValueError):
+        pass
+    return {"format": fmt, "include_raw": include_raw, "channels": {}}
+
+
+def save_state(path: Path, state: dict):
+    """Atomically write the export progress file."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(json.dumps(state, indent=2))
+    os.replace(tmp_path, path)
+
+
+def finish_partition(writer: PartitionWriter, position: tuple, state: dict, state_path: Path, channel_id: str):
+    """Move a finished partition into place and record the channel's last exported message."""
+    writer.close()
+    state["channels"][channel_id] = {
+        "last_month": writer.month,
+        "last_ts_us": position[0],
+        "last_id": position[1]
+    }
+    save_state(state_path, state)
+
+
+def export_archive(
+    db: SlackDatabase,
+    output_dir: str,
+    fmt: str = "ndjson",
+    channel: Optional[str] = None,
+    include_raw: bool = False,
+    batch_size: int = 5000
+) -> dict:
+    """Export messages to output_dir/<channel_id>/<YYYY-MM>.<fmt>.gz, streaming in ts order.
+
+    Each channel is read with SlackDatabase.iter_messages, so memory stays
+    at one batch plus one open partition. Each finished partition records
+    its month and the (ts_us, id) of its last message in export-state.json.
+    A rerun skips channels with nothing newer than that position and
+    otherwise rewrites from the start of that month, so both an interrupted
+    export and messages collected since the last run are picked up. A state
+    file written with a different format or include_raw is discarded and
+    everything is exported again. Returns row, partition and throughput counts.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+    output = Path(output_dir)
+    output.mkdir(parents=True, exist_ok=True)
+    state_path = output / STATE_FILE
+    state = load_state(state_path, fmt, include_raw)
+
+    channel_ids = [channel] if channel else [c["id"] for c in db.get_all_channels()]
+    stats = {"rows": 0, "partitions": 0, "skipped_channels": 0}
+    start = time.perf_counter()
+
+    for cid in channel_ids:
+        progress = state["channels"].get(cid)
+        since = None
+        if progress:
+            position = (progress["last_ts_us"], progress["last_id"])
+            if next(db.iter_messages(channel=cid, batch_size=1, after=position), None) is None:
+                stats["skipped_channels"] += 1
+                continue
+            # Partitions are whole months, so the last exported month is rewritten with any new rows
+            since = month_start(progress["last_month"])
+
+        writer = None
+        position = None
+        try:
+            for row in db.iter_messages(channel=cid, since=since, batch_size=batch_size, include_raw=include_raw):
+                month = month_of(row["ts"])
+                if writer is None or writer.month != month:
+                    if writer is not None:
+                        finish_partition(writer, position, state, state_path, cid)
+                        stats["partitions"] += 1
+                    writer = PartitionWriter(output / cid / f"{month}.{fmt}.gz", fmt, month)
+
+                record = {field: row[field] for field in FIELDS}
+                if include_raw:
+                    record["raw"] = decode_raw_json(row["raw_json"])
+                writer.write(record)
+                position = (row["ts_us"], row["id"])
+                stats["rows"] += 1
+        except BaseException:
+            if writer is not None:
+                writer.abort()
+            raise
+
+        if writer is not None:
+            finish_partition(writer, position, state, state_path, cid)
+            stats["partitions"] += 1
+
+    elapsed = time.perf_counter() - start
+    stats["seconds"] = elapsed
+    stats["rows_per_second"] = stats["rows"] / elapsed if elapsed > 0 else 0.0
+    return stats
@@ -20,6 +20,7 @@ load_dotenv()
 
 import argparse
 import sys
+from functools import lru_cache
 
 try:
     from slack_sdk import WebClient
@@ -35,9 +36,11 @@ from database import SlackDatabase
 class SlackDMSender:
     """Send DMs using Slack user tokens."""
 
-    def __init__(self, config: Config, db: SlackDatabase):
+    def __init__(self, config: Config, db: SlackDatabase, cache_size: int = 1024):
         self.config = config
         self.db = db
+        # Failed lookups raise, so they are never cached
+        self._resolve_user_id = lru_cache(maxsize=cache_size)(self._lookup_user_id)
 
         if not config.user_token:
             raise ValueError(
@@ -52,50 +55,41 @@ class SlackDMSender:
         """
         Get user ID from name, display name, email, or ID.
 
+        Resolved IDs are kept in an LRU cache, so repeated recipients cost
+        nothing after the first lookup.
+
         Args:
             identifier: User name, display name, email, or ID
 
         Returns:
             Slack user ID
         """
+        return self._resolve_user_id(identifier)
+
+    def _lookup_user_id(self, identifier: str) -> str:
+        """Resolve an identifier with one indexed database lookup, or one API call for unknown emails."""
         # Check if it's already a user ID
         if identifier.startswith("U") and len(identifier) > 8:
             return identifier
 
-        # Try to find in local database first
+        # Case-insensitive match on name, display name, real name or email
         user = self.db.get_user_by_name(identifier)
         if user:
             return user["id"]
 
-        # Try looking up by email via API
-        try:
-            response = self.client.users_lookupByEmail(email=identifier)
-            return response["user"]["id"]
-        except SlackApiError:
-            pass
-
-        # Try listing users and searching
-        try:
-            cursor = None
-            while True:
-                response = self.client.users_list(cursor=cursor, limit=200)
-                for user in response.get("members", []):
-                    profile = user.get("profile", {})
-                    if (
-                        user.get("name") == identifier
-                        or profile.get("display_name") == identifier
-                        or profile.get("real_name") == identifier
-                        or profile.get("email") == identifier
-                    ):
-                        return user["id"]
-
-                cursor = response.get("response_metadata", {}).get("next_cursor")
-                if not cursor:
-                    break
-        except SlackApiError as e:
-            print(f"Error looking up user: {e}")
-
-        raise ValueError(f"Could not find user: {identifier}")
+        # Emails can be resolved directly; store the user so the next lookup is local
+        if "@" in identifier:
+            try:
+                response = self.client.users_lookupByEmail(email=identifier)
+                self.db.upsert_users([response["user"]])
+                return response["user"]["id"]
+            except SlackApiError:
+                pass
+
+        raise ValueError(
+            f"Could not find user: {identifier}. "
+            "Run collector.py to refresh the user list."
+        )
 
     def open_dm_channel(self, user_id: str) -> str:
         """
@@ -234,7 +228,7 @@ To send as different users, you need their individual user tokens.
         config.db_path = args.db
 
     # Initialize database
-    db = SlackDatabase(config.db_path)
+    db = SlackDatabase.from_config(config)
 
     if args.list_users:
         try:
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Generate project summaries with the llm CLI
+Used by the README cog block to fill in missing or stale _summary.md files, several projects at a time
+"""
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import json
+
+import instrumentation
+from project_manifest import tokenize
+
+# Model to use for generating summaries
+MODEL = "github/gpt-4.1"
+PROMPT = """Summarize this research project concisely. Write just 1 paragraph (3-5 sentences) followed by an optional short bullet list if there are key findings. Vary your opening - don't start with "This report" or "This research". Include 1-2 links to key tools/projects. Be specific but brief. No emoji."""
+SUMMARY_WORKERS = int(os.environ.get('SUMMARY_WORKERS', '4'))
+SUMMARY_RETRIES = 3
+SUMMARY_TIMEOUT = 60
+# Records the inputs each _summary.md was generated from; committed alongside the summaries
+SUMMARY_INDEX_PATH = '.summary-index.json'
+SUMMARY_INDEX_VERSION = 1
+
+def summary_key(readme_path, model=MODEL, prompt=PROMPT):
+    """Hash everything a summary depends on: the model, the prompt and the README"""
+    digest = hashlib.sha256()
+    digest.update(model.encode('utf-8') + b'\0')
+    digest.update(prompt.encode('utf-8') + b'\0')
+    with open(readme_path, 'rb') as f:
+        digest.update(f.read())
+    return digest.hexdigest()
+
+def load_summary_index(path=SUMMARY_INDEX_PATH):
+    """Load the summary cache index as a dict of project name to entry"""
+    try:
+        with open(path, 'r') as f:
+            index = json.load(f)
+        if index.get('version') == SUMMARY_INDEX_VERSION:
+            return index['entries']
+    except (OSError, ValueError, KeyError):
+        pass
+    return {}
+
+def save_summary_index(entries, path=SUMMARY_INDEX_PATH):
+    """Write the summary cache index"""
+    with open(path, 'w') as f:
+        json.dump({'version': SUMMARY_INDEX_VERSION, 'entries': entries}, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+def check_summaries(projects, research_dir, entries):
+    """Split projects with a README into summary cache hits and misses
+
+    A miss is a project with no _summary.md, or whose README, prompt or model
+    changed since its summary was generated. A summary with no index entry
+    yet is adopted as a hit at the current key, so a lost index never
+    triggers regenerating every summary. Returns (hits, misses, keys).
+    """
+    hits = []
+    misses = []
+    keys = {}
+    for project in projects:
+        if not project['has_readme']:
+            continue
+        name = project['name']
+        keys[name] = summary_key(research_dir / name / "README.md")
+        entry = entries.get(name)
+        if project['summary'] is None:
+            misses.append(project)
+        elif entry is None:
+            entries[name] = {'key': keys[name]}
+            hits.append(project)
+        elif entry['key'] == keys[name]:
+            hits.append(project)
+        else:
+            misses.append(project)
+    return hits, misses, keys
+
+def generate_summary(dirname, readme_path, model=MODEL, retries=SUMMARY_RETRIES, timeout=SUMMARY_TIMEOUT):
+    """Summarize a project's README with llm, retrying failed calls with exponential backoff
+
+    Timings go to stderr, since cog captures stdout into README.md.
+    """
+    error = None
+    for attempt in range(1, retries + 1):
+        start = time.perf_counter()
+        try:
+            command = ['llm', '-m', model, '-s', PROMPT]
+            with open(readme_path, 'r') as f, instrumentation.subprocess_call(command[:3]):
+                result = subprocess.run(
+                    command,
+                    stdin=f,
+                    capture_output=True,
+                    text=True,
+                    timeout=timeout
+                )
+            elapsed = time.perf_counter() - start
+            if result.returncode != 0:
+                error = f"LLM command failed for {dirname} with return code {result.returncode}"
+                if result.stderr:
+                    error += f"\nStderr: {result.stderr}"
+            elif not result.stdout.strip():
+                error = f"LLM command returned no output for {dirname}"
+            else:
+                print(f"Summarized {dirname} in {elapsed:.1f}s (attempt {attempt})", file=sys.stderr)
+                return result.stdout.strip()
+        except subprocess.TimeoutExpired:
+            elapsed = time.perf_counter() - start
+            error = f"LLM command timed out for {dirname} after {timeout}s"
+
+        print(f"{error} ({elapsed:.1f}s, attempt {attempt}/{retries})", file=sys.stderr)
+        if attempt < retries:
+            time.sleep(2 ** attempt)
+    raise RuntimeError(error)
+
+def generate_summaries(projects, research_dir, workers=SUMMARY_WORKERS, index_path=SUMMARY_INDEX_PATH):
+    """Generate summaries for manifest projects whose summary is missing or stale
+
+    Calls run on a bounded thread pool. Each result is written to its own
+    project's _summary.md and stored back on the project, so rendering order
+    is still the manifest order. The cache index is saved even if a call
+    fails, so finished summaries are not regenerated on the next run.
+    """
+    entries = load_summary_index(index_path)
+    hits, misses, keys = check_summaries(projects, research_dir, entries)
+    print(f"Summary cache: {len(hits)} hits, {len(misses)} misses", file=sys.stderr)
+
+    def summarize(project):
+        folder_path = research_dir / project['name']
+        description = generate_summary(project['name'], folder_path / "README.md")
+        # Save to cache file
+        with open(folder_path / "_summary.md", 'w') as f:
+            f.write(description + '\n')
+        entries[project['name']] = {'key': keys[project['name']]}
+        return description
+
+    start = time.perf_counter()
+    try:
+        if misses:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                descriptions = list(executor.map(summarize, misses))
+            print(f"Generated {len(misses)} summaries in {time.perf_counter() - start:.1f}s "
+                  f"with {workers} workers", file=sys.stderr)
+
+            for project, description in zip(misses, descriptions):
+                project['summary'] = description
+                project['tokens'] = tokenize(f"{project['name']} {description}")
+    finally:
+        # Drop entries for projects that no longer exist
+        save_summary_index({name: entry for name, entry in entries.items() if name in keys}, index_path)
@@ -1,29 +1,107 @@
 // Service Worker for AI Research Projects PWA
-const CACHE_NAME = 'ai-research-v1';
-const urlsToCache = [
-  '/research/',
-  '/research/index.html',
-  '/research/manifest.json'
-];
-
-// Install event - cache core files
-self.addEventListener('install', (event) => {
-  event.waitUntil(
-    caches.open(CACHE_NAME)
-      .then((cache) => {
-        console.log('Opened cache');
-        return cache.addAll(urlsToCache);
-      })
+// Core assets are versioned by content hash in precache-manifest.json, which
+// generate_index.py rewrites on every build. Only assets whose hash changed
+// are refetched, and assets dropped from the manifest are evicted.
+const PRECACHE = 'ai-research-precache';
+const RUNTIME_CACHE = 'ai-research-runtime-v1';
+const PRECACHE_MANIFEST_URL = new URL('precache-manifest.json', self.location).href;
+
+let updating = null;
+
+// Bring the precache in line with the current manifest
+async function updatePrecache() {
+  const response = await fetch(PRECACHE_MANIFEST_URL, { cache: 'no-cache' });
+  if (!response.ok) {
+    return;
+  }
+  const manifest = await response.json();
+
+  const cache = await caches.open(PRECACHE);
+  const stored = await cache.match(PRECACHE_MANIFEST_URL);
+  const previous = stored ? await stored.json() : { assets: {} };
+
+  // Refetch changed assets; a failed fetch keeps its old revision so it is retried next time
+  const assets = {};
+  const changed = Object.keys(manifest.assets).filter(
+    (path) => previous.assets[path] !== manifest.assets[path]
+  );
+  for (const path of Object.keys(manifest.assets)) {
+    if (!changed.includes(path)) {
+      assets[path] = manifest.assets[path];
+    }
+  }
+  await Promise.all(changed.map(async (path) => {
+    try {
+      const assetResponse = await fetch(new URL(path, self.location), { cache: 'no-cache' });
+      if (assetResponse.ok) {
+        await cache.put(new URL(path, self.location).href, assetResponse);
+        assets[path] = manifest.assets[path];
+      } else if (previous.assets[path]) {
+        assets[path] = previous.assets[path];
+      }
+    } catch (error) {
+      if (previous.assets[path]) {
+        assets[path] = previous.assets[path];
+      }
+    }
+  }));
+
+  // Evict assets that are no longer listed
+  const stale = Object.keys(previous.assets).filter((path) => !(path in manifest.assets));
+  await Promise.all(stale.map((path) => cache.delete(new URL(path, self.location).href)));
+
+  await cache.put(PRECACHE_MANIFEST_URL, new Response(JSON.stringify({ assets })));
+  if (changed.length || stale.length) {
+    console.log(`Precache updated: ${changed.length} changed, ${stale.length} removed`);
+  }
+}
+
+// Run one precache update at a time
+function revalidatePrecache() {
+  if (!updating) {
+    updating = updatePrecache()
       .catch((error) => {
-        console.error('Cache installation failed:', error);
+        console.error('Precache update failed:', error);
       })
-  );
+      .finally(() => {
+        updating = null;
+      });
+  }
+  return updating;
+}
+
+// Install event - precache core files
+self.addEventListener('install', (event) => {
+  event.waitUntil(revalidatePrecache());
   // Force the waiting service worker to become the active service worker
   self.skipWaiting();
 });
 
 // Fetch event - serve from cache, fallback to network
 self.addEventListener('fetch', (event) => {
+  // Project shards change with every index rebuild - network first, cache as offline fallback.
+  // Content-hashed files such as style.<hash>.css never change and are served cache-first below.
+  const pathname = new URL(event.request.url).pathname;
+  if (pathname.includes('/index-data/') && !/\.[0-9a-f]{12}\.[a-z]+$/.test(pathname)) {
+    event.respondWith(
+      fetch(event.request)
+        .then((response) => {
+          if (response && response.status === 200) {
+            const responseToCache = response.clone();
+            caches.open(RUNTIME_CACHE).then((cache) => cache.put(event.request, responseToCache));
+          }
+          return response;
+        })
+        .catch(() => caches.match(event.request))
+    );
+    return;
+  }
+
+  // Page loads are served from the precache at once while the manifest is checked in the background
+  if (event.request.mode === 'navigate') {
+    event.waitUntil(revalidatePrecache());
+  }
+
   event.respondWith(
     caches.match(event.request)
       .then((response) => {
@@ -45,7 +123,7 @@ self.addEventListener('fetch', (event) => {
           const responseToCache = response.clone();
 
           // Cache the new response
-          caches.open(CACHE_NAME)
+          caches.open(RUNTIME_CACHE)
             .then((cache) => {
               // Only cache same-origin requests
               if (event.request.url.startsWith(self.location.origin)) {
@@ -65,7 +143,7 @@ self.addEventListener('fetch', (event) => {
 
 // Activate event - clean up old caches
 self.addEventListener('activate', (event) => {
-  const cacheWhitelist = [CACHE_NAME];
+  const cacheWhitelist = [PRECACHE, RUNTIME_CACHE];
 
   event.waitUntil(
     caches.keys().then((cacheNames) => {
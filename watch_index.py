@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Watch the research repository and keep index.html up to date while authoring
+Listens for changes to project directories, README.md, _summary.md and index.html files (inotify on
+Linux, polling elsewhere) and re-renders only the affected project cards
+"""
+import argparse
+import ctypes
+import ctypes.util
+import json
+import os
+import pathlib
+import select
+import struct
+import sys
+import time
+from datetime import datetime, timezone
+
+import generate_index
+import project_manifest
+
+WATCHED_FILES = {'README.md', '_summary.md', 'index.html'}
+
+# inotify event flags from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = os.O_CLOEXEC
+EVENT_HEADER = struct.Struct('iIII')
+PROJECT_MASK = IN_CLOSE_WRITE | IN_MODIFY | IN_ATTRIB | IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO
+ROOT_MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO
+
+def is_project_dir(name):
+    """Check whether a top-level directory name is a project, using the same rules as discovery"""
+    return not name.startswith('.') and name not in project_manifest.GENERATED_DIRS
+
+def list_projects(research_dir):
+    """Return the names of all project directories"""
+    with os.scandir(research_dir) as it:
+        return {entry.name for entry in it if entry.is_dir() and is_project_dir(entry.name)}
+
+class InotifyWatcher:
+    """Report changed projects from inotify events on the root and every project directory"""
+
+    def __init__(self, research_dir):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.libc = libc
+        self.fd = libc.inotify_init1(IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.research_dir = research_dir
+        self.projects = {}
+        self.root = self.add_watch(research_dir, ROOT_MASK)
+        for name in list_projects(research_dir):
+            self.watch_project(name)
+
+    def add_watch(self, path, mask):
+        """Add a watch and return its descriptor"""
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {path}")
+        return wd
+
+    def watch_project(self, name):
+        """Start watching a project directory; it may already be gone"""
+        try:
+            self.projects[self.add_watch(self.research_dir / name, PROJECT_MASK)] = name
+        except OSError:
+            pass
+
+    def read_events(self):
+        """Yield (wd, mask, name) for each queued event"""
+        buffer = os.read(self.fd, 1 << 16)
+        offset = 0
+        while offset < len(buffer):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(buffer, offset)
+            offset += EVENT_HEADER.size
+            name = buffer[offset:offset + length].rstrip(b'\0').decode('utf-8', 'surrogateescape')
+            offset += length
+            yield wd, mask, name
+
+    def wait(self, timeout=None, settle=0.05):
+        """Block until something changes, then return the changed project names
+
+        Events are collected until none arrive for settle seconds, so an
+        editor's write-rename-chmod sequence is handled in one update.
+        Returns None if the event queue overflowed and everything must be
+        rescanned.
+        """
+        changed = set()
+        overflow = False
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        while ready:
+            for wd, mask, name in self.read_events():
+                if mask & IN_Q_OVERFLOW:
+                    overflow = True
+                elif wd == self.root:
+                    if mask & IN_ISDIR and is_project_dir(name):
+                        changed.add(name)
+                        if mask & (IN_CREATE | IN_MOVED_TO):
+                            self.watch_project(name)
+                elif mask & IN_IGNORED:
+                    self.projects.pop(wd, None)
+                elif wd in self.projects and (name in WATCHED_FILES or mask & IN_DELETE_SELF):
+                    changed.add(self.projects[wd])
+            ready, _, _ = select.select([self.fd], [], [], settle)
+        return None if overflow else changed
+
+    def close(self):
+        """Stop watching"""
+        os.close(self.fd)
+
+class PollingWatcher:
+    """Report changed projects by comparing directory and watched file mtimes on an interval"""
+
+    def __init__(self, research_dir, interval=1.0):
+        self.research_dir = research_dir
+        self.interval = interval
+        self.signatures = self.snapshot()
+
+    def signature(self, name):
+        """Return the mtimes of a project directory and its watched files"""
+        path = self.research_dir / name
+        stamps = []
+        for filename in sorted(WATCHED_FILES):
+            try:
+                stamps.append(os.stat(path / filename).st_mtime_ns)
+            except OSError:
+                stamps.append(None)
+        return (os.stat(path).st_mtime_ns, tuple(stamps))
+
+    def snapshot(self):
+        """Return the signature of every project directory"""
+        signatures = {}
+        for name in list_projects(self.research_dir):
+            try:
+                signatures[name] = self.signature(name)
+            except OSError:
+                pass
+        return signatures
+
+    def wait(self, timeout=None):
+        """Poll until something changes, then return the changed project names"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            signatures = self.snapshot()
+            changed = {
+                name for name in signatures.keys() | self.signatures.keys()
+                if signatures.get(name) != self.signatures.get(name)
+            }
+            self.signatures = signatures
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return changed
+            time.sleep(self.interval)
+
+    def close(self):
+        """Nothing to release"""
+        pass
+
+def open_watcher(research_dir, poll=False, interval=1.0):
+    """Use inotify where available and fall back to polling"""
+    if not poll and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(research_dir)
+        except (OSError, AttributeError) as e:
+            print(f"inotify unavailable ({e}), falling back to polling")
+    return PollingWatcher(research_dir, interval)
+
+def sort_key(project):
+    """Order projects newest first, then by name, matching build_manifest"""
+    return (-datetime.fromisoformat(project['date']).timestamp(), project['name'])
+
+class IndexWatcher:
+    """Hold the project list and rendered cards in memory and update them per change"""
+
+    def __init__(self, args):
+        self.args = args
+        self.research_dir = pathlib.Path.cwd()
+        manifest = project_manifest.build_manifest(workers=args.workers)
+        self.origin = manifest['origin']
+        self.projects = {project['name']: project for project in manifest['projects']}
+        self.cards = {}
+        self.digests = {}
+        self.search_tokens = None
+        os.makedirs(generate_index.DATA_DIR, exist_ok=True)
+        self.stylesheet = generate_index.write_stylesheet()
+        self.render()
+        self.write_precache_manifest()
+
+    def rescan(self, names):
+        """Refresh the given projects from disk; returns the names whose entry changed"""
+        changed = set()
+        for name in names:
+            path = self.research_dir / name
+            old = self.projects.get(name)
+            if not path.is_dir():
+                if self.projects.pop(name, None):
+                    changed.add(name)
+                continue
+            try:
+                entry = project_manifest.scan_project(path)
+            except OSError:
+                continue
+            # New directories have no commit yet, so they use the directory mtime like discovery does
+            date = old['date'] if old else datetime.fromtimestamp(
+                entry['mtime'], tz=timezone.utc).isoformat()
+            project = {
+                'name': name,
+                'date': date,
+                'summary': entry['summary'],
+                'has_readme': entry['has_readme'],
+                'has_index': entry['has_index'],
+                'icon': project_manifest.get_project_icon(name),
+                'tokens': entry['tokens']
+            }
+            if project != old:
+                self.projects[name] = project
+                changed.add(name)
+        return changed
+
+    def render(self):
+        """Rewrite index.html and its data files, re-rendering only cards whose input changed
+
+        Card bodies do not depend on position, so a new project only
+        re-renders itself and the card losing the newest badge. Returns the
+        number of cards rendered.
+        """
+        projects = sorted(self.projects.values(), key=sort_key)
+        cards = []
+        rendered = 0
+        for project_id, project in enumerate(projects):
+            key = (project_id == 0, json.dumps(project, sort_keys=True))
+            cached = self.cards.get(project['name'])
+            if cached is None or cached[0] != key:
+                html = generate_index.render_card(project, self.origin, is_newest=(project_id == 0))
+                cached = (key, html)
+                self.cards[project['name']] = cached
+                rendered += 1
+            cards.append(cached[1])
+        for name in self.cards.keys() - self.projects.keys():
+            del self.cards[name]
+
+        tokens = [project['tokens'] for project in projects]
+        if tokens != self.search_tokens:
+            generate_index.write_if_changed(generate_index.SEARCH_INDEX_PATH, [
+                json.dumps(generate_index.build_search_index(projects), separators=(',', ':'))
+            ])
+            self.search_tokens = tokens
+
+        page_size = None
+        if self.args.sharded:
+            page_size = self.args.page_size
+            generate_index.write_shards(projects, self.origin, page_size, self.args.shard_size, cards)
+        generate_index.write_if_changed('index.html', generate_index.render_page(
+            projects, self.origin, self.stylesheet, page_size, cards))
+        return rendered
+
+    def write_precache_manifest(self):
+        """Rewrite the precache manifest, hashing only project pages whose digest was dropped
+
+        Returns True if the manifest changed.
+        """
+        return generate_index.write_precache_manifest(self.projects.values(), self.stylesheet, self.digests)
+
+    def update(self, names):
+        """Apply a batch of changed project names, or rescan everything if names is None"""
+        start = time.perf_counter()
+        if names is None:
+            names = list_projects(self.research_dir) | self.projects.keys()
+            self.digests.clear()
+        changed = self.rescan(sorted(names))
+        # A project page can be edited without changing its card, so rehash every reported project
+        for name in names:
+            self.digests.pop(f"{name}/index.html", None)
+        rendered = self.render() if changed else 0
+        precache_changed = self.write_precache_manifest()
+        elapsed = (time.perf_counter() - start) * 1000
+        if changed:
+            print(f"Updated index.html for {', '.join(sorted(changed))}: "
+                  f"{rendered} cards re-rendered in {elapsed:.1f} ms")
+        elif precache_changed:
+            print(f"Updated {generate_index.PRECACHE_MANIFEST_PATH} for {', '.join(sorted(names))} "
+                  f"in {elapsed:.1f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Regenerate index.html as projects change")
+    parser.add_argument('--poll', action='store_true', help="Poll for changes instead of using inotify")
+    parser.add_argument('--interval', type=float, default=1.0, help="Polling interval in seconds")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Number of threads used for the initial project scan")
+    parser.add_argument('--sharded', action='store_true',
+                        help="Inline only the newest projects and load the rest from JSON shards")
+    parser.add_argument('--page-size', type=int, default=50,
+                        help="Projects inlined in index.html in sharded mode")
+    parser.add_argument('--shard-size', type=int, default=200,
+                        help="Projects per JSON shard in sharded mode")
+    args = parser.parse_args()
+
+    index = IndexWatcher(args)
+    watcher = open_watcher(index.research_dir, args.poll, args.interval)
+    print(f"Watching {len(index.projects)} projects with {type(watcher).__name__}, press Ctrl-C to stop")
+    try:
+        while True:
+            index.update(watcher.wait())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+if __name__ == '__main__':
+    main()